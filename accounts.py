@@ -0,0 +1,26 @@
+# accounts.py — SmartSpend logins (salted PBKDF2 hash stored in the user's partition)
+import os, json, hashlib, hmac, secrets
+import storage
+
+ACCOUNT_FILE = "account.json"
+ITERATIONS = 200_000
+
+def _hash(password, salt):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(salt), ITERATIONS).hex()
+
+def login(username, password):
+    # Returns the user id, registering the account on first login; None if the password is wrong
+    uid = storage.user_id(username)
+    path = os.path.join(storage.user_dir(uid), ACCOUNT_FILE)
+    if os.path.exists(path):
+        with open(path) as f: acc = json.load(f)
+        return uid if hmac.compare_digest(acc["hash"], _hash(password, acc["salt"])) else None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    salt = secrets.token_hex(16)
+    tmp = f"{path}.{os.getpid()}.{secrets.token_hex(4)}.tmp"  # never a half-written account, even with two first logins
+    with open(tmp, "w") as f:
+        json.dump({"username": username.strip(), "salt": salt, "hash": _hash(password, salt)}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return uid
@@ -0,0 +1,26 @@
+# activity.py — "Recent Activity" across ledgers: top-K by a k-way merge
+#
+# Each ledger is read newest-first through storage.recent() (a cached
+# date-sorted order for CSV, an indexed ORDER BY ... LIMIT for SQLite) and the
+# streams are merged with a heap, so a page of k rows costs O((offset + k) log L)
+# instead of concatenating and sorting every ledger.
+import heapq, itertools
+import pandas as pd
+import storage
+
+def _stream(path, label, chunk):
+    offset = 0
+    while True:
+        page = storage.recent(path, chunk, offset)
+        for rec in page.to_dict("records"):
+            rec["Type"] = label
+            yield rec
+        if len(page) < chunk: return
+        offset += len(page)
+        chunk *= 2
+
+def recent_activity(sources, k=10, offset=0):
+    # sources: [(ledger path, label), ...]; returns rows offset..offset+k, newest first
+    streams = [_stream(path, label, offset + k) for path, label in sources]
+    merged = heapq.merge(*streams, key=lambda r: r["Date"], reverse=True)
+    return pd.DataFrame(list(itertools.islice(merged, offset, offset + k)))
@@ -0,0 +1,203 @@
+# aggregates.py — SmartSpend running totals, maintained on every ledger write
+#
+# For each ledger we keep buckets keyed by (month, group) — group is Category
+# for expenses, Source for incomes, Type for investments — plus running totals,
+# per-month and per-group sums derived from them. storage.py calls us after each
+# append/delete (through incremental.py) so updates are O(1); the Dashboard
+# reads the sums without touching the ledgers. The buckets are persisted to
+# monthly_summary.csv (one per data directory) so a fresh server process does
+# not need to rescan either; that file is rewritten off the write path, at most
+# every PERSIST_AFTER seconds. Buckets hold integer cents (see typed.py), so
+# totals are exact however many writes they have absorbed; queries return
+# amounts in currency units.
+import os, threading, itertools, atexit
+from contextlib import ExitStack
+import numpy as np
+import pandas as pd
+import storage
+import metrics
+import typed
+import incremental
+if storage.BACKEND == "sqlite": import sqlite_store
+
+SUMMARY_FILE = "monthly_summary.csv"
+SUMMARY_COLS = ["Ledger","Month","Group","Amount","Value","Count"]
+# Column used for the per-group buckets of each aggregated ledger
+GROUP_COLS = {"expenses.csv": "Category", "incomes.csv": "Source", "investments.csv": "Type"}
+VIEW = "aggregates"
+PERSIST_AFTER = 2.0  # seconds between a write and the summary rewrite that includes it
+
+_versions = itertools.count(1)
+_dirty = set()  # data directories whose summary file is behind
+_timer = None
+_timer_lock = threading.Lock()
+
+def _empty():
+    # Every sum is [amount cents, current-value cents, row count]
+    return {"buckets": {}, "total": [0, 0, 0], "months": {}, "groups": {}, "version": 0}
+
+# ---------------------------
+# Bucket arithmetic
+# ---------------------------
+def _add(acc, key, amount, value, count):
+    cur = acc.get(key)
+    if cur is None: cur = acc[key] = [0, 0, 0]
+    cur[0] += amount; cur[1] += value; cur[2] += count
+    if cur[2] <= 0: del acc[key]
+
+def _apply(s, month, group, amount, value, count):
+    _add(s["buckets"], (month, group), amount, value, count)
+    t = s["total"]; t[0] += amount; t[1] += value; t[2] += count
+    if month: _add(s["months"], month, amount, value, count)
+    _add(s["groups"], group, amount, value, count)
+
+def _month(x):
+    try:
+        return pd.Timestamp(x).strftime("%Y-%m")
+    except (TypeError, ValueError):
+        return ""  # missing/invalid date: counted in totals, not in any month
+
+def _apply_record(path, s, r, sign):
+    gcol = GROUP_COLS[os.path.basename(path)]
+    _apply(s, _month(r.get("Date")), incremental.group(r.get(gcol)),
+           sign * typed.cents(r.get("Amount")), sign * typed.cents(r.get("CurrentValue")), sign)
+
+def _apply_frame(path, s, df, sign=1):
+    # Vectorized over a typed frame (typed.encode): group the rows by integer month
+    # number and label code, then apply each (month, group) bucket once
+    gcol = GROUP_COLS[os.path.basename(path)]
+    if gcol in df.columns:
+        codes, names = df[gcol].cat.codes.to_numpy(), df[gcol].cat.categories
+    else:
+        codes, names = np.full(len(df), -1), []
+    frame = pd.DataFrame({
+        "Month": typed.months(df["Date"]),
+        "Group": codes,
+        "Amount": df["Amount"].fillna(0).to_numpy(dtype="int64"),
+        "Value": df["CurrentValue"].fillna(0).to_numpy(dtype="int64") if "CurrentValue" in df.columns else 0,
+    })
+    g = frame.groupby(["Month","Group"]).agg(Amount=("Amount","sum"), Value=("Value","sum"), Count=("Amount","size"))
+    for (month, group), r in zip(g.index, g.itertuples(index=False)):
+        _apply(s, typed.month_label(month), "" if group < 0 else str(names[group]),
+               sign * int(r.Amount), sign * int(r.Value), sign * int(r.Count))
+
+# ---------------------------
+# Build: from the summary file if it is fresh, else one scan of the ledger
+# ---------------------------
+def _scan(path):
+    if storage.BACKEND == "sqlite":
+        # Grouped inside SQLite, so only the bucket rows cross into Python
+        g = sqlite_store.buckets(path, GROUP_COLS[os.path.basename(path)])
+        return _from_summary(path, g.assign(Ledger=os.path.basename(path)))
+    s = _empty()
+    df = storage.read_typed(path)
+    with metrics.timer("aggregate.scan") as m:
+        if not df.empty: _apply_frame(path, s, df)
+        m["rows"] = len(df)
+    _schedule(os.path.dirname(path))
+    return s
+
+def _from_summary(path, summary):
+    s = _empty()
+    for r in summary[summary["Ledger"] == os.path.basename(path)].itertuples(index=False):
+        _apply(s, r.Month, r.Group, typed.cents(r.Amount), typed.cents(r.Value), int(r.Count))
+    return s
+
+def _summary(path):
+    # The directory's summary, if it was written after the ledger's last change (else None)
+    spath = os.path.join(os.path.dirname(path), SUMMARY_FILE)
+    if storage.BACKEND != "csv" or not os.path.exists(spath) or os.path.getsize(spath) == 0: return None
+    if os.stat(spath).st_mtime_ns < os.stat(path).st_mtime_ns: return None
+    with metrics.timer("aggregate.summary_read") as m:
+        summary = pd.read_csv(spath, keep_default_na=False, dtype={"Month": str, "Group": str})
+        m["rows"], m["bytes"] = len(summary), os.path.getsize(spath)
+    return summary
+
+def _build(key):
+    summary = _summary(key)
+    s = _from_summary(key, summary) if summary is not None else _scan(key)
+    s["version"] = next(_versions)
+    return s
+
+def _on_write(key, s, records, sign):
+    if isinstance(records, pd.DataFrame) or len(records) > incremental.BATCH_ROWS:
+        _apply_frame(key, s, typed.encode(pd.DataFrame(records)), sign)
+    else:
+        for r in records: _apply_record(key, s, r, sign)
+    s["version"] = next(_versions)
+    _schedule(os.path.dirname(key))
+
+incremental.register(VIEW, GROUP_COLS, _build, _on_write)
+
+def _get(path): return incremental.get(VIEW, path)
+
+# ---------------------------
+# Summary file: rewritten in the background, a while after the writes it records
+# ---------------------------
+def _schedule(d):
+    global _timer
+    if storage.BACKEND != "csv": return  # SQLite answers the bucket query itself
+    with _timer_lock:
+        _dirty.add(d)
+        if _timer is None:
+            _timer = threading.Timer(PERSIST_AFTER, persist)
+            _timer.daemon = True
+            _timer.start()
+
+def persist():
+    # Write the summaries that are behind (also run at exit)
+    global _timer
+    with _timer_lock:
+        dirs, _timer = list(_dirty), None
+        _dirty.clear()
+    for d in dirs: _persist(d)
+
+def _persist(d):
+    # Every aggregated ledger of the directory, under their write locks: no process can
+    # write them meanwhile, so the file (newer than each ledger) matches them exactly
+    ledgers = [os.path.join(d, n) for n in sorted(GROUP_COLS) if storage.ledger_exists(os.path.join(d, n))]
+    if not ledgers: return
+    rows = []
+    with ExitStack() as stack:
+        for p in ledgers: stack.enter_context(storage.write_lock(p))
+        for p in ledgers:
+            name = os.path.basename(p)
+            for (month, group), (a, v, c) in list(_get(p)["buckets"].items()):
+                rows.append([name, month, group, typed.money(a), typed.money(v), c])  # decimal text, exact back to cents
+        spath = os.path.join(d, SUMMARY_FILE)
+        with metrics.timer("aggregate.persist") as m:
+            pd.DataFrame(rows, columns=SUMMARY_COLS).to_csv(spath + ".tmp", index=False)
+            m["rows"] = len(rows)
+            if metrics.ENABLED: m["bytes"] = os.path.getsize(spath + ".tmp")
+        os.replace(spath + ".tmp", spath)
+        with _timer_lock: _dirty.discard(d)  # rebuilds above re-marked it; nothing can have written since
+
+atexit.register(persist)
+
+# ---------------------------
+# Queries (no ledger scans)
+# ---------------------------
+def total(path, field="Amount"):
+    t = _get(path)["total"]
+    return typed.money(t[1] if field == "CurrentValue" else t[0])
+
+def count(path): return _get(path)["total"][2]
+
+def month_total(path, month): return typed.money(_get(path)["months"].get(month, [0])[0])
+
+def monthly(path):
+    months = _get(path)["months"]
+    return pd.Series({m: typed.money(v[0]) for m, v in sorted(months.items())}, dtype="float64", name="Amount")
+
+def by_group(path):
+    groups = _get(path)["groups"]
+    s = pd.Series({g: typed.money(v[0]) for g, v in groups.items()}, dtype="float64", name="Amount")
+    s.index.name = GROUP_COLS[os.path.basename(path)]
+    return s
+
+def buckets(path):
+    # One row per (month, group) bucket: Month ("YYYY-MM", "" = no date), Group, Amount
+    b = _get(path)["buckets"]
+    return pd.DataFrame([(m, g, typed.money(v[0])) for (m, g), v in b.items()], columns=["Month", "Group", "Amount"])
+
+def version(path): return _get(path)["version"]
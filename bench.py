@@ -0,0 +1,181 @@
+# bench.py — SmartSpend benchmarks: ledger load, aggregates and dashboard paths at scale
+#
+# Synthetic ledgers (expenses of the given size, incomes and investments a tenth
+# of it, in the real schemas) are generated once into a scratch directory and
+# reused. Each size is then measured in a fresh interpreter, so caches start
+# cold and peak RSS belongs to that size alone. Results are compared with a
+# saved baseline; a case that got slower (or a size that needs more memory) by
+# more than REGRESSION is reported and the exit status is 1.
+#
+# Usage: python bench.py [--sizes 10k,1M,10M] [--repeat N] [--save] [--baseline FILE] [--data DIR]
+import os, sys, json, time, shutil, argparse, tempfile, subprocess
+import numpy as np
+import pandas as pd
+try:
+    import resource  # peak RSS (POSIX)
+except ImportError:
+    resource = None
+
+SIZES = {"10k": 10_000, "1M": 1_000_000, "10M": 10_000_000}
+BASELINE_FILE = "bench_baseline.json"
+REGRESSION = 1.25   # slower / larger than baseline by this factor ...
+MIN_DELTA_MS = 2.0  # ... and by at least this much (timer noise on tiny cases)
+GEN_CHUNK = 1_000_000
+
+CATEGORIES = ["Food", "Transport", "Shopping", "Bills", "Entertainment", "Health", "Education", "Other"]
+NOTES = ["Coffee", "Burger", "Bus fare", "Taxi", "Groceries", "Rent", "Cinema", "Pharmacy", "Books", "Gym",
+         "Electricity", "Internet", "Shoes", "Lunch", "Fuel", "Course fee"]
+SOURCES = ["Salary", "Business", "Freelance", "Bonus", "Gift"]
+TYPES = ["Stocks", "Mutual Funds", "Crypto", "Gold", "Real Estate", "Other"]
+
+# ---------------------------
+# Synthetic ledgers
+# ---------------------------
+def _frame(name, ids, rng):
+    n = len(ids)
+    dates = (np.datetime64("2015-01-01") + rng.integers(0, 11 * 365, n)).astype("datetime64[D]").astype(str)
+    amount = np.round(rng.lognormal(3.5, 1.0, n), 2)
+    if name == "expenses.csv":
+        cols = {"Category": rng.choice(CATEGORIES, n), "Note": rng.choice(NOTES, n), "Amount": amount}
+    elif name == "incomes.csv":
+        cols = {"Source": rng.choice(SOURCES, n), "Amount": np.round(amount * 40, 2)}
+    else:
+        cols = {"Type": rng.choice(TYPES, n), "Amount": amount * 10,
+                "CurrentValue": np.round(amount * 10 * rng.normal(1.05, 0.2, n), 2)}
+    import storage
+    return pd.DataFrame({"Id": ids, "Date": dates, **cols}).reindex(columns=storage.COLUMNS[name])
+
+def generate(d, rows, seed=0):
+    # Write the ledgers in chunks (bounded memory at 10M rows); a marker file records completion
+    marker = os.path.join(d, "rows.json")
+    if os.path.exists(marker) and json.load(open(marker)) == rows: return
+    shutil.rmtree(d, ignore_errors=True)
+    os.makedirs(d)
+    rng = np.random.default_rng(seed)
+    for name, n in (("expenses.csv", rows), ("incomes.csv", max(1, rows // 10)), ("investments.csv", max(1, rows // 10))):
+        path = os.path.join(d, name)
+        for lo in range(0, n, GEN_CHUNK):
+            ids = np.arange(lo + 1, min(n, lo + GEN_CHUNK) + 1, dtype="int64")
+            _frame(name, ids, rng).to_csv(path, mode="a", header=lo == 0, index=False, lineterminator="\n")
+    pd.DataFrame({"Name": ["Car", "Phone", "Trip"], "TargetAmount": [100000.0, 5000.0, 8000.0],
+                  "SavedSoFar": [2000.0, 500.0, 0.0], "TargetDate": ["2027-11-18", "2026-12-20", "2027-06-01"]}) \
+        .to_csv(os.path.join(d, "goals.csv"), index=False)
+    with open(marker, "w") as f: json.dump(rows, f)
+
+# ---------------------------
+# Cases: (setup, timed call) on the real code paths, run in a worker process
+# ---------------------------
+def _cases(d):
+    import storage, aggregates, incremental
+    from activity import recent_activity
+    from smartscore import compute_smartscore, monthly_smartscore, goal_score
+    exp, inc, inv, goal = (os.path.join(d, n) for n in ("expenses.csv", "incomes.csv", "investments.csv", "goals.csv"))
+    ledgers = (exp, inc, inv)
+    summary = os.path.join(d, aggregates.SUMMARY_FILE)
+
+    def cold_cache():
+        for p in ledgers: storage.invalidate(p)
+    def load():
+        for p in ledgers: storage.read_typed(p)  # parse + date / money / label typing (the cached form)
+    def cold_aggregates():
+        incremental.clear(aggregates.VIEW)
+        if os.path.exists(summary): os.remove(summary)
+    def totals():
+        for p in ledgers: aggregates.total(p), aggregates.monthly(p)  # bucket rescan of the parsed ledgers
+    def score():
+        df_goal = storage.read_ledger(goal)
+        t_exp, t_inc, t_inv = aggregates.total(exp), aggregates.total(inc), aggregates.total(inv, "CurrentValue")
+        compute_smartscore(t_inc, t_exp, t_inv, 2000.0, df_goal)
+        monthly_smartscore(aggregates.monthly(inc), aggregates.monthly(exp), aggregates.monthly(inv), 2000.0,
+                           goal_score(df_goal))
+    def cold_orders():
+        storage._orders.clear()
+    def recent():
+        recent_activity([(inc, "Income"), (exp, "Expense"), (inv, "Investment")], k=10)
+    def add_expense():
+        storage.append_record(exp, {"Date": "2026-01-01", "Category": "Food", "Note": "Coffee", "Amount": 4.5})
+
+    # add expense last: it invalidates the ledger caches the other cases warm up
+    return [("load + normalize", cold_cache, load),
+            ("dashboard totals + monthly", cold_aggregates, totals),
+            ("smartscore", None, score),
+            ("recent activity sort", cold_orders, recent),
+            ("add expense write", None, add_expense)]
+
+def _peak_rss_mb():
+    if resource is None: return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024  # bytes on macOS, KiB elsewhere
+
+def worker(d, repeat):
+    # Run every case `repeat` times on a scratch copy (the write case appends); print JSON
+    work = tempfile.mkdtemp(prefix="smartspend-bench-")
+    try:
+        for n in os.listdir(d): shutil.copy(os.path.join(d, n), work)
+        import storage
+        for n in ("expenses.csv", "incomes.csv", "investments.csv", "goals.csv"): storage.ensure_ledger(os.path.join(work, n))
+        times = {}
+        for name, setup, fn in _cases(work):
+            times[name] = []
+            for _ in range(repeat):
+                if setup: setup()
+                t = time.perf_counter()
+                fn()
+                times[name].append((time.perf_counter() - t) * 1000)
+        print(json.dumps({"times": times, "rss_mb": _peak_rss_mb()}))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+# ---------------------------
+# Report + baseline
+# ---------------------------
+def run(size, data_dir, repeat):
+    d = os.path.join(data_dir, size)
+    generate(d, SIZES[size])
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", d, "--repeat", str(repeat)],
+                         capture_output=True, text=True, check=True).stdout
+    res = json.loads(out.strip().splitlines()[-1])
+    return {"cases": {name: {"p50": float(np.percentile(t, 50)), "p95": float(np.percentile(t, 95)), "max": max(t)}
+                      for name, t in res["times"].items()},
+            "rss_mb": res["rss_mb"]}
+
+def regressed(now, base, floor=MIN_DELTA_MS):
+    return base is not None and now is not None and now > base * REGRESSION and now - base > floor
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark SmartSpend ledger paths on synthetic data")
+    ap.add_argument("--sizes", default="10k,1M", help=f"comma-separated, from {', '.join(SIZES)}")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--save", action="store_true", help="store these results as the new baseline")
+    ap.add_argument("--baseline", default=BASELINE_FILE)
+    ap.add_argument("--data", default=os.path.join(tempfile.gettempdir(), "smartspend-bench-data"))
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.worker:
+        worker(args.worker, args.repeat)
+        sys.exit(0)
+
+    backend = os.environ.get("SMARTSPEND_BACKEND", "csv")
+    baseline = json.load(open(args.baseline)) if os.path.exists(args.baseline) else {}
+    base_runs = baseline.get(backend, {})
+    results, over = {}, False
+    for size in args.sizes.split(","):
+        res = results[size] = run(size, args.data, args.repeat)
+        base = base_runs.get(size, {})
+        print(f"== {size} rows ({backend})  peak RSS {res['rss_mb']:.0f} MB"
+              + (f"  (baseline {base['rss_mb']:.0f} MB)" if base.get("rss_mb") else ""))
+        if regressed(res["rss_mb"], base.get("rss_mb"), 0):
+            over = True
+            print("   peak RSS REGRESSED")
+        for name, r in res["cases"].items():
+            b = base.get("cases", {}).get(name, {}).get("p50")
+            flag = regressed(r["p50"], b)
+            over |= flag
+            vs = f"  vs {b:9.2f} ({(r['p50'] / b - 1) * 100:+.0f}%)" if b else ""
+            print(f"   {name:<28} p50 {r['p50']:9.2f}  p95 {r['p95']:9.2f}  max {r['max']:9.2f} ms{vs}"
+                  + ("  REGRESSED" if flag else ""))
+    if args.save:
+        baseline[backend] = {**base_runs, **results}
+        with open(args.baseline, "w") as f: json.dump(baseline, f, indent=1)
+        print(f"baseline saved to {args.baseline}")
+    sys.exit(1 if over and not args.save else 0)
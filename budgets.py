@@ -0,0 +1,198 @@
+# budgets.py — per-category / per-period budgets with alerts evaluated on write
+#
+# Budgets live in settings.json: "monthly_budget" is the overall monthly limit
+# and "budgets" adds rows {"Category", "Period", "Amount"} (Category "" = all
+# spending; Period Week / Month / Year). For each expense ledger we keep running
+# spend counters keyed by (period, period number, category), built once from the
+# typed ledger (one groupby per period) and adjusted by the storage hook on every
+# write (see incremental.py), like aggregates.py: an expense moves six counters (three periods, its
+# category and all spending). Each counter that feeds a budget of the current
+# period has that budget's rules re-evaluated on the spot — 80% / 100% of the
+# limit and a pace projection — so the Dashboard reads ready statuses instead of
+# scanning the month's expenses per render. All statuses are refreshed only when
+# the budgets change or the day rolls over (pace depends on the calendar).
+import os, json
+import numpy as np
+import pandas as pd
+import storage
+import typed
+import incremental
+
+PERIODS = ("Week", "Month", "Year")  # weeks run Monday-Sunday
+ALL = ""  # category of a budget on all spending
+WARN_AT = 0.8        # share of the limit that raises a warning
+PACE_AFTER = 0.25    # share of the period elapsed before pace projections count
+STATUS_COLS = ["Category", "Period", "Spent", "Limit", "Used", "Projected", "Level"]
+VIEW = "budgets"
+
+# state per expense ledger: {"spent", "limits", "settings", "day", "current", "status"}
+
+# ---------------------------
+# Periods (day numbers since 1970-01-01 -> period numbers)
+# ---------------------------
+def _period_ids(day):
+    month = np.asarray(day, dtype="int64").astype("datetime64[D]").astype("datetime64[M]").astype("int64")
+    return {"Week": (np.asarray(day, dtype="int64") + 3) // 7, "Month": month, "Year": month // 12}
+
+def _bounds(period, pid):
+    # First day and day after the last of a period
+    if period == "Week": return pid * 7 - 3, pid * 7 + 4
+    months = [pid, pid + 1] if period == "Month" else [pid * 12, pid * 12 + 12]
+    start, end = np.array(months).astype("datetime64[M]").astype("datetime64[D]").astype("int64")
+    return int(start), int(end)
+
+def _today(today=None): return typed.days(pd.Timestamp(today or pd.Timestamp.today()).normalize())
+
+# ---------------------------
+# Budgets from settings
+# ---------------------------
+def limits(settings):
+    # {(period, category): limit cents} from a settings dict; unset (0) limits are left out
+    out = {}
+    overall = typed.cents(settings.get("monthly_budget", 0))
+    if overall > 0: out[("Month", ALL)] = overall
+    for b in settings.get("budgets", []):
+        c = typed.cents(b.get("Amount"))
+        if b.get("Period") in PERIODS and c > 0: out[(b["Period"], incremental.group(b.get("Category")))] = c
+    return out
+
+def clean(rows):
+    # Budget rows as edited in Settings -> the list stored under "budgets" (last row per category + period wins)
+    out = {}
+    for r in rows:
+        c = typed.cents(r.get("Amount"))
+        if r.get("Period") in PERIODS and c > 0:
+            out[(r["Period"], incremental.group(r.get("Category")))] = typed.money(c)
+    return [{"Category": cat, "Period": p, "Amount": a} for (p, cat), a in out.items()]
+
+def _settings_path(key): return os.path.join(os.path.dirname(key), storage.SET_FILE)
+
+def _settings_stamp(key):
+    try:
+        st = os.stat(_settings_path(key))
+        return st.st_mtime_ns, st.st_size
+    except FileNotFoundError:
+        return None
+
+def _load_limits(key):
+    try:
+        with open(_settings_path(key)) as f: return limits(json.load(f))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+# ---------------------------
+# Counters
+# ---------------------------
+def _add(spent, key, cents):
+    v = spent.get(key, 0) + cents
+    if v: spent[key] = v
+    else: spent.pop(key, None)
+
+def _count(df):
+    # {(period, id, category): cents} over a typed frame; undated rows are not in any period
+    ok = df["Date"].notna().to_numpy(dtype=bool) if "Date" in df.columns else np.zeros(len(df), dtype=bool)
+    if not ok.any(): return {}
+    day = df["Date"].to_numpy(dtype="int64", na_value=typed.NAT)[ok]
+    amount = df["Amount"].fillna(0).to_numpy(dtype="int64")[ok]
+    if "Category" in df.columns:
+        codes, names = df["Category"].cat.codes.to_numpy()[ok], df["Category"].cat.categories
+    else:
+        codes, names = np.full(len(day), -1), []
+    out = {}
+    for period, pid in _period_ids(day).items():
+        frame = pd.DataFrame({"P": pid, "C": codes, "A": amount})
+        for p, a in frame.groupby("P")["A"].sum().items(): _add(out, (period, int(p), ALL), int(a))
+        # uncategorized rows only count toward all spending
+        for (p, c), a in frame[frame["C"] >= 0].groupby(["P", "C"])["A"].sum().items():
+            _add(out, (period, int(p), str(names[c])), int(a))
+    return out
+
+def _record_keys(r):
+    # Counters an expense record moves (none if it has no valid date)
+    try:
+        d = pd.Timestamp(r.get("Date"))
+    except (TypeError, ValueError):
+        return []
+    if pd.isna(d): return []
+    ids = _period_ids(typed.days(d))
+    cat = incremental.group(r.get("Category"))
+    cats = (ALL, cat) if cat else (ALL,)
+    return [(period, int(ids[period]), c) for period in PERIODS for c in cats]
+
+# ---------------------------
+# Rules
+# ---------------------------
+def _evaluate(s, period, cat):
+    limit = s["limits"][(period, cat)]
+    pid = s["current"][period]
+    spent = s["spent"].get((period, pid, cat), 0)
+    start, end = _bounds(period, pid)
+    elapsed = (s["day"] - start + 1) / (end - start)
+    projected = round(spent / elapsed)
+    if spent > limit: level = "over"
+    elif spent > WARN_AT * limit: level = "warn"
+    elif elapsed >= PACE_AFTER and projected > limit: level = "pace"
+    else: level = None
+    s["status"][(period, cat)] = (spent, limit, projected, level)
+
+def _evaluate_all(s, today):
+    s["day"] = today
+    s["current"] = {p: int(v) for p, v in _period_ids(today).items()}
+    s["status"] = {}
+    for period, cat in s["limits"]: _evaluate(s, period, cat)
+
+def _move(s, key, cents):
+    _add(s["spent"], key, cents)
+    period, pid, cat = key
+    if pid == s["current"][period] and (period, cat) in s["limits"]: _evaluate(s, period, cat)
+
+# ---------------------------
+# Build + refresh
+# ---------------------------
+def _build(key):
+    s = {"spent": _count(storage.read_typed(key)), "limits": _load_limits(key), "settings": _settings_stamp(key)}
+    _evaluate_all(s, _today())
+    return s
+
+def _on_write(key, s, records, sign):
+    if isinstance(records, pd.DataFrame) or len(records) > incremental.BATCH_ROWS:
+        for k, cents in _count(typed.encode(pd.DataFrame(records))).items(): _move(s, k, sign * cents)
+    else:
+        for r in records:
+            cents = sign * typed.cents(r.get("Amount"))
+            for k in _record_keys(r): _move(s, k, cents)
+
+incremental.register(VIEW, {storage.EXP_FILE}, _build, _on_write)
+
+def _get(path, today=None):
+    key = os.path.abspath(path)
+    day = _today(today)
+    s = incremental.get(VIEW, key)
+    if s["settings"] == _settings_stamp(key) and s["day"] == day: return s
+    with incremental.lock:
+        settings = _settings_stamp(key)
+        if settings != s["settings"]: s["limits"], s["settings"] = _load_limits(key), settings
+        _evaluate_all(s, day)
+    return s
+
+# ---------------------------
+# Queries (no ledger scans)
+# ---------------------------
+def status(path, today=None):
+    # One row per budget for the current periods: Spent, Limit, Projected (to the period's end),
+    # Used (share of the limit) and Level ("over" / "warn" / "pace" / None)
+    s = _get(path, today)
+    with incremental.lock: items = list(s["status"].items())
+    rows = [(cat, period, typed.money(spent), typed.money(limit), spent / limit, typed.money(projected), level)
+            for (period, cat), (spent, limit, projected, level) in items]
+    rows.sort(key=lambda r: (PERIODS.index(r[1]), r[0] != ALL, r[0]))
+    return pd.DataFrame(rows, columns=STATUS_COLS)
+
+def alerts(path, today=None):
+    st = status(path, today)
+    return st[st["Level"].notna()].reset_index(drop=True)
+
+def spent(path, period, category=ALL, today=None):
+    # Spending so far in the current week / month / year
+    s = _get(path, today)
+    return typed.money(s["spent"].get((period, s["current"][period], category), 0))
@@ -0,0 +1,177 @@
+# common.py — shared page furniture for SmartSpend (CSS, sidebar, session data handle)
+#
+# app.py routes on st.session_state.page and runs one script from pages/ per
+# rerun. Every data page starts with common.open_page(name), then loads just
+# the ledgers it shows. storage (and with it pandas) is imported on first use,
+# so the Landing and login pages never pay for it.
+import os, sys, json, threading
+import streamlit as st
+import metrics
+
+# (page, icon, script) in menu order; Landing/login live in app.py
+PAGES = [
+    ("Dashboard", "💹", "pages/0_Dashboard.py"),
+    ("Add Expense", "💸", "pages/1_Add_expense.py"),
+    ("Add Income", "💰", "pages/5_Add_income.py"),
+    ("Add Investment", "📈", "pages/6_Add_investment.py"),
+    ("View Expenses", "📋", "pages/2_View_expenses.py"),
+    ("Import", "📥", "pages/7_Import.py"),
+    ("Goals", "🎯", "pages/8_Goals.py"),
+    ("Settings", "⚙️", "pages/4_Settings.py"),
+    ("AI Coach", " 🤖", "pages/3_Insights.py"),
+]
+
+# ---------------------------
+# CSS
+# ---------------------------
+def apply_css(page_name):
+    bg = {
+        "Landing": "https://img.freepik.com/premium-photo/beautiful-woman-portrait-exposure-city-effect-cityscape-reflection_916191-157179.jpg",
+        "Dashboard": "https://as1.ftcdn.net/v2/jpg/06/04/92/34/1000_F_604923462_ezo4yBKPS5flnaE91U9mZaFI8dKWryBd.jpg",
+        "Add Expense": "https://as1.ftcdn.net/v2/jpg/06/04/92/34/1000_F_604923462_ezo4yBKPS5flnaE91U9mZaFI8dKWryBd.jpg",
+        "Add Income": "https://as1.ftcdn.net/v2/jpg/06/04/92/34/1000_F_604923462_ezo4yBKPS5flnaE91U9mZaFI8dKWryBd.jpg",
+        "Add Investment": "https://as1.ftcdn.net/v2/jpg/06/04/92/34/1000_F_604923462_ezo4yBKPS5flnaE91U9mZaFI8dKWryBd.jpg",
+        "View Expenses": "https://as1.ftcdn.net/v2/jpg/06/04/92/34/1000_F_604923462_ezo4yBKPS5flnaE91U9mZaFI8dKWryBd.jpg",
+        "Import": "https://as1.ftcdn.net/v2/jpg/06/04/92/34/1000_F_604923462_ezo4yBKPS5flnaE91U9mZaFI8dKWryBd.jpg",
+        "Goals": "https://as1.ftcdn.net/v2/jpg/06/04/92/34/1000_F_604923462_ezo4yBKPS5flnaE91U9mZaFI8dKWryBd.jpg",
+        "Settings": "https://as1.ftcdn.net/v2/jpg/06/04/92/34/1000_F_604923462_ezo4yBKPS5flnaE91U9mZaFI8dKWryBd.jpg",
+        "AI Coach": "https://as1.ftcdn.net/v2/jpg/06/04/92/34/1000_F_604923462_ezo4yBKPS5flnaE91U9mZaFI8dKWryBd.jpg"
+    }.get(page_name, "")
+    gradient = "rgba(0,0,0,0.7)" if page_name=="Landing" else "rgba(0,0,0,0.7)"
+
+    st.markdown(f"""
+    <style>
+    .stApp {{
+        background: linear-gradient({gradient},{gradient}), url('{bg}');
+        background-size: cover; background-position: center;
+    }}
+    .neon {{
+        color: #00fff7; text-align:center; font-family: 'Courier New', monospace;
+        text-shadow: 0 0 5px #00fff7, 0 0 10px #00fff7, 0 0 20px #00fff7, 0 0 40px #00fff7;
+    }}
+    .neon-small {{
+        color: #fff; text-align:center; font-family:'Courier New', monospace;
+        text-shadow: 0 0 3px #00fff7, 0 0 6px #00fff7, 0 0 12px #00fff7;
+    }}
+    .stButton>button {{
+        background-color:#00fff7; color:black; font-weight:bold;
+        border-radius:10px; padding:10px 30px; font-size:18px;
+        box-shadow:0 0 10px #00fff7; transition:0.3s;
+    }}
+    .stButton>button:hover {{
+        box-shadow:0 0 20px #00fff7; transform: scale(1.05);
+    }}
+    .marquee {{
+        width:100%; overflow:hidden; white-space:nowrap; box-sizing:border-box; margin-bottom:30px;
+    }}
+    .marquee span {{
+        display:inline-block; padding-left:100%; animation:marquee 25s linear infinite;
+        font-size:18px; color:#00fff7; font-family:'Courier New', monospace;
+        text-shadow:0 0 5px #00fff7,0 0 10px #00fff7;
+    }}
+    @keyframes marquee {{ 0% {{transform:translateX(0%)}} 100% {{transform:translateX(-100%)}} }}
+    </style>
+    """, unsafe_allow_html=True)
+
+# ---------------------------
+# Per-user data handle (opened once per session, at login)
+# ---------------------------
+def ensure_settings(path):
+    if not os.path.exists(path):
+        default = {"currency": "SAR", "monthly_budget": 0.0, "theme": "black-neon"}
+        with open(path, "w") as f:
+            json.dump(default, f)
+
+@st.cache_resource(show_spinner=False)
+def open_partition(uid):
+    # One-time per user and process: create missing ledgers, repair torn appends, default settings
+    import storage
+    files = storage.open_user(uid)
+    ensure_settings(files["settings"])
+    return files
+
+def open_session(uid):
+    files = open_partition(uid)
+    with open(files["settings"], "r") as f: user_settings = json.load(f)
+    st.session_state.uid = uid
+    st.session_state.files = files
+    st.session_state.currency = user_settings.get("currency","SAR")
+    st.session_state.monthly_budget = float(user_settings.get("monthly_budget",0.0))
+    st.session_state.theme = user_settings.get("theme","black-neon")
+
+def session_files():
+    # The current user's partition: file paths for exp / inc / inv / goal / settings
+    import storage
+    if "login_uid" in st.session_state: open_session(st.session_state.pop("login_uid"))  # switch to the user's own partition
+    elif "files" not in st.session_state: open_session(storage.GUEST)
+    metrics.owner(st.session_state.uid)  # this run's diagnostics are only shown to this user
+    return st.session_state.files
+
+def load_settings(files):
+    with open(files["settings"], "r") as f: return json.load(f)
+def save_settings(files, d):
+    with open(files["settings"], "w") as f: json.dump(d, f)
+
+def warm_categorizer(path):
+    # Fit / catch up the expense categorizer in the background. Until a page needs it
+    # for a prediction, categorizer is imported in that thread, never on the render path.
+    if "categorizer" in sys.modules: sys.modules["categorizer"].warm(path)
+    else: threading.Thread(target=lambda: __import__("categorizer").warm(path), name="categorizer import",
+                           daemon=True).start()
+
+# ---------------------------
+# Navigation
+# ---------------------------
+def go(page):
+    st.session_state.page = page
+    st.rerun()
+
+def sidebar(files):
+    # Build display labels with icons
+    menu_labels = [f"{icon} {name}" for name, icon, _ in PAGES]
+
+    # Find index of current page
+    current_idx = next((i for i, (name, _, _) in enumerate(PAGES) if name == st.session_state.page), 0)
+
+    # Sidebar title
+    st.sidebar.markdown("<h2 style='text-align:center; color:#00fff7;'>📂 SmartSpend Menu</h2>", unsafe_allow_html=True)
+    st.sidebar.markdown("---")
+
+    # Use radio buttons with icons
+    choice_label = st.sidebar.radio(
+        "Navigate",
+        menu_labels,
+        index=current_idx,
+        label_visibility="collapsed"  # hide default label for cleaner look
+    )
+
+    # Map selected label back to page name
+    selected_page = PAGES[menu_labels.index(choice_label)][0]
+
+    if selected_page != st.session_state.page:
+        go(selected_page)
+
+    # Signed-in user + logout (back to the guest partition)
+    import storage
+    st.sidebar.markdown("---")
+    if files["user"] != storage.GUEST:
+        st.sidebar.caption(f"👤 Signed in as {files['user']}")
+        if st.sidebar.button("🚪 Log out"):
+            open_session(storage.GUEST)
+            go("Landing")
+
+def back_button():
+    if st.button("⬅️ Back to Dashboard"):
+        go("Dashboard")
+
+def open_page(name):
+    # Preamble of every data page: session data handle, background, sidebar menu
+    files = session_files()
+    apply_css(name)
+    sidebar(files)
+    return files
+
+# ---------------------------
+# Utilities
+# ---------------------------
+def currency_format(amount): return f"{amount:,.2f} {st.session_state.currency}"
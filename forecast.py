@@ -0,0 +1,209 @@
+# forecast.py — monthly forecasts per category / source / type, with intervals
+#
+# Input is the (month, group) buckets aggregates.py already keeps, laid out as
+# one row per series on a shared month axis. Every series is fitted in one
+# batched NumPy pass:
+#   - a seasonal profile (calendar-month effects, fitted jointly with a line) once a
+#     series has MIN_SEASONAL months of history, centred to sum to zero,
+#   - a linear trend over the last WINDOW months of the deseasonalized series,
+#   - a residual sigma, giving the usual regression prediction interval.
+# Series of different lengths (new categories, users who joined later) are
+# handled with a mask, so thousands of users can be stacked into one fit.
+# Only complete months are fitted; the current month is the first forecast.
+# Fits are cached per ledger until its aggregates change.
+#
+# Usage: python forecast.py [--months N] [--users UID ...]   (CSV of savings forecasts per user)
+import os, sys, argparse, threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import aggregates
+import storage
+
+WINDOW = 12         # months in the rolling trend fit
+MIN_TREND = 3       # fewer observed months: flat forecast (no slope)
+MIN_SEASONAL = 24   # months of history before a seasonal profile is fitted
+MAX_HISTORY = 60    # months of history used at most
+Z = 1.2816          # 80% two-sided interval
+LEDGERS = {"inc": "incomes.csv", "exp": "expenses.csv", "inv": "investments.csv"}
+EPOCH_MONTH = pd.Period("1970-01", "M")  # month ordinal 0
+MAX_FITS = 256      # ledgers whose fit is kept (least recently used dropped)
+
+_fits = OrderedDict()  # abs ledger path -> (aggregates version, end month, fit), least recently used first
+_lock = threading.Lock()
+
+# ---------------------------
+# Batched model
+# ---------------------------
+def _linfit(Y, M, x):
+    # Least squares line per row over the masked columns: intercept at x=0, slope, n, mean x, Sxx
+    w = M.astype("float64")
+    n = w.sum(axis=1)
+    safe_n = np.maximum(n, 1)
+    xbar = (w * x).sum(axis=1) / safe_n
+    ybar = (w * Y).sum(axis=1) / safe_n
+    dx = (x - xbar[:, None]) * w
+    sxx = (dx * dx).sum(axis=1)
+    sxy = (dx * (Y - ybar[:, None])).sum(axis=1)
+    slope = np.where((sxx > 0) & (n >= MIN_TREND), sxy / np.where(sxx > 0, sxx, 1.0), 0.0)
+    return ybar - slope * xbar, slope, n, xbar, sxx
+
+def fit(Y, M, end):
+    # Y: (series, months) sums, last column = month ordinal `end`; M: which cells are observed history
+    S, T = Y.shape
+    x = np.arange(T, dtype="float64")
+    moy = (end - T + 1 + np.arange(T)) % 12  # calendar month of each column (ordinal 0 = January 1970)
+
+    # Seasonal profile over the full history, fitted jointly with a line: the slope comes from
+    # each month's deviation from its calendar-month mean, so the seasonal swing cannot tilt it
+    # (a line fitted first would, and the profile would inherit the error as a sawtooth)
+    w = M.astype("float64")
+    n_all = w.sum(axis=1)
+    O = (moy[None, :] == np.arange(12)[:, None]).astype("float64").T  # (months, 12) one-hot calendar month
+    cnt = w @ O
+    seen = cnt > 0
+    xm = (w * x) @ O / np.maximum(cnt, 1)
+    ym = (w * Y) @ O / np.maximum(cnt, 1)
+    dx = (x - xm[:, moy]) * w
+    sxx = (dx * dx).sum(axis=1)
+    b = np.where(sxx > 0, (dx * (Y - ym[:, moy])).sum(axis=1) / np.where(sxx > 0, sxx, 1.0), 0.0)
+    season = np.where(seen, ym - b[:, None] * xm, 0.0)
+    season -= np.where(seen, season, 0.0).sum(axis=1, keepdims=True) / np.maximum(seen.sum(axis=1), 1)[:, None]
+    season *= seen
+    seasonal = n_all >= MIN_SEASONAL
+    season *= seasonal[:, None]
+    per_month = np.where(seasonal, n_all / 12, np.inf)  # observations behind each seasonal mean
+
+    # Rolling trend on the deseasonalized tail, and its residual spread
+    Mw = M & (x >= T - WINDOW)
+    D = Y - season[:, moy]
+    a, b, n, xbar, sxx = _linfit(D, Mw, x)
+    resid = np.where(Mw, D - (a[:, None] + b[:, None] * x), 0.0)
+    sigma = np.sqrt((resid ** 2).sum(axis=1) / np.maximum(n - np.where(b != 0, 2, 1), 1))
+    sigma /= np.sqrt(np.maximum(1 - 1 / per_month, 0.5))  # the profile was fitted to the same noise
+    return {"a": a, "b": b, "season": season, "per_month": per_month, "sigma": sigma, "n": n, "xbar": xbar,
+            "sxx": sxx, "T": T, "end": end}
+
+def predict(f, months=1):
+    # (mean, standard error) arrays of shape (series, months) for the months after `end`
+    h = np.arange(1, months + 1)
+    x0 = f["T"] - 1 + h
+    mean = f["a"][:, None] + f["b"][:, None] * x0 + f["season"][:, (f["end"] + h) % 12]
+    sxx = np.where(f["sxx"] > 0, f["sxx"], np.inf)[:, None]  # no spread in x: no slope term
+    spread = 1 + 1 / np.maximum(f["n"], 1)[:, None] + (x0 - f["xbar"][:, None]) ** 2 / sxx \
+        + (1 / f["per_month"])[:, None]  # error of the seasonal means
+    se = f["sigma"][:, None] * np.sqrt(spread)
+    return np.maximum(mean, 0.0), se  # sums of amounts cannot go negative
+
+# ---------------------------
+# Ledger -> series matrix
+# ---------------------------
+def last_complete_month(today=None):
+    return pd.Period(today or pd.Timestamp.today(), "M").ordinal - 1
+
+def _series(bucket_frames, end):
+    # [(key, DataFrame Month/Group/Amount), ...] -> [(key, group), ...], Y, M on one month axis ending at `end`
+    if not bucket_frames: return [], np.zeros((0, 1)), np.zeros((0, 1), dtype=bool)
+    long = pd.concat([b for _, b in bucket_frames], ignore_index=True)
+    long["Src"] = np.repeat(np.arange(len(bucket_frames)), [len(b) for _, b in bucket_frames])
+    long = long[long["Month"] != ""]  # rows without a date have no month to forecast from
+    labels, codes = np.unique(long["Month"].to_numpy(dtype=str), return_inverse=True)
+    long["Month"] = pd.PeriodIndex(labels, freq="M").asi8[codes] if len(labels) else np.zeros(0, dtype="int64")
+    long = long[long["Month"] <= end]
+    if long.empty: return [], np.zeros((0, 1)), np.zeros((0, 1), dtype=bool)
+    grouped = long.groupby(["Src", "Group"], sort=True)
+    row = grouped.ngroup().to_numpy()
+    rows = [(bucket_frames[src][0], g) for src, g in grouped.size().index]
+    month, amount = long["Month"].to_numpy(), long["Amount"].to_numpy(dtype="float64")
+    first = np.full(len(rows), end, dtype="int64")
+    np.minimum.at(first, row, month)
+    start = max(int(first.min()), end - MAX_HISTORY + 1)
+    T = end - start + 1
+    keep = month >= start
+    Y = np.zeros((len(rows), T))
+    np.add.at(Y, (row[keep], month[keep] - start), amount[keep])
+    M = np.arange(T)[None, :] >= (np.maximum(first, start) - start)[:, None]  # observed from each series' first month
+    return rows, Y, M
+
+def _fit_ledger(path, end):
+    key = os.path.abspath(path)
+    version = aggregates.version(path)
+    with _lock:
+        hit = _fits.get(key)
+        if hit and hit[0] == version and hit[1] == end:
+            _fits.move_to_end(key)
+            return hit[2]
+    rows, Y, M = _series([(None, aggregates.buckets(path))], end)
+    f = fit(Y, M, end) if rows else None
+    f = {"groups": [g for _, g in rows], "fit": f}
+    with _lock:
+        _fits[key] = (version, end, f)
+        _fits.move_to_end(key)
+        while len(_fits) > MAX_FITS: _fits.popitem(last=False)
+    return f
+
+# ---------------------------
+# Queries
+# ---------------------------
+def _months_index(end, months):
+    return pd.period_range(EPOCH_MONTH + (end + 1), periods=months, freq="M").astype(str)
+
+def forecast(path, months=3, today=None):
+    # Per group and month: Forecast, Low, High (80%), from the cached fit
+    end = last_complete_month(today)
+    f = _fit_ledger(path, end)
+    idx = _months_index(end, months)
+    if f["fit"] is None: return pd.DataFrame(columns=["Month", "Group", "Forecast", "Low", "High"])
+    mean, se = predict(f["fit"], months)
+    return pd.DataFrame({
+        "Month": np.tile(idx, len(f["groups"])),
+        "Group": np.repeat(f["groups"], months),
+        "Forecast": mean.ravel(),
+        "Low": np.maximum(mean - Z * se, 0.0).ravel(),
+        "High": (mean + Z * se).ravel(),
+    })
+
+def _totals(path, months, end):
+    # Ledger total per month: (mean, variance), groups treated as independent
+    f = _fit_ledger(path, end)
+    if f["fit"] is None: return np.zeros(months), np.zeros(months)
+    mean, se = predict(f["fit"], months)
+    return mean.sum(axis=0), (se ** 2).sum(axis=0)
+
+def savings(files, months=1, today=None):
+    # Income - expenses - investment contributions per coming month, with an 80% interval
+    end = last_complete_month(today)
+    parts = {k: _totals(files[k], months, end) for k in LEDGERS}
+    mean = parts["inc"][0] - parts["exp"][0] - parts["inv"][0]
+    sd = np.sqrt(parts["inc"][1] + parts["exp"][1] + parts["inv"][1])
+    return pd.DataFrame({"Forecast": mean, "Low": mean - Z * sd, "High": mean + Z * sd},
+                        index=pd.Index(_months_index(end, months), name="Month"))
+
+# ---------------------------
+# Nightly batch: every user's series in one fit
+# ---------------------------
+def savings_batch(uids, months=1, today=None):
+    end = last_complete_month(today)
+    frames = [((uid, k), aggregates.buckets(storage.user_files(uid)[k])) for uid in uids for k in LEDGERS]
+    rows, Y, M = _series(frames, end)
+    idx = _months_index(end, months)
+    out = pd.DataFrame(0.0, index=pd.MultiIndex.from_product([uids, idx], names=["User", "Month"]),
+                       columns=["Forecast", "Variance"])
+    if rows:
+        mean, se = predict(fit(Y, M, end), months)
+        sign = np.array([1.0 if k == "inc" else -1.0 for (_, k), _ in rows])
+        users = [uid for (uid, _), _ in rows]
+        per = pd.DataFrame({"User": np.repeat(users, months), "Month": np.tile(idx, len(rows)),
+                            "Forecast": (sign[:, None] * mean).ravel(), "Variance": (se ** 2).ravel()})
+        out = out.add(per.groupby(["User", "Month"]).sum(), fill_value=0.0)
+    sd = np.sqrt(out.pop("Variance"))
+    return out.assign(Low=out["Forecast"] - Z * sd, High=out["Forecast"] + Z * sd)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Forecast monthly savings for every user partition")
+    ap.add_argument("--months", type=int, default=1)
+    ap.add_argument("--users", nargs="*", help="user ids (default: every partition under data/users, plus the guest)")
+    args = ap.parse_args()
+    uids = args.users or storage.all_users()
+    for uid in uids: storage.open_user(uid)
+    savings_batch(uids, args.months).round(2).to_csv(sys.stdout)
@@ -0,0 +1,109 @@
+# goals.py — goal projections and savings allocation, vectorized over all goals
+#
+# A user's goals are planned as one queue: ordered by Priority (1 = high), then
+# by TargetDate, each goal is funded in turn from the average monthly surplus
+# (income - expenses - investment contributions, from the running aggregates).
+# Cumulative sums over that order give every goal's projected completion month
+# in one NumPy pass. allocate() splits an amount the same way: first what each
+# goal needs this month to stay on schedule for its deadline, then the rest in
+# queue order until goals are full. Amounts are integer cents (see typed.py),
+# so allocations add up exactly; the page writes them back in one append.
+import numpy as np
+import pandas as pd
+import aggregates
+import typed
+
+PRIORITIES = {"High": 1, "Medium": 2, "Low": 3}
+DEFAULT_PRIORITY = 2
+SURPLUS_MONTHS = 12  # months averaged for the monthly surplus
+LAST = np.iinfo("int64").max  # sorts goals without a deadline after the rest
+
+# ---------------------------
+# Inputs
+# ---------------------------
+def this_month(today=None): return pd.Period(today or pd.Timestamp.today(), "M").ordinal
+
+def surplus(files, months=SURPLUS_MONTHS, today=None):
+    # Average monthly income - expenses - investment contributions over the last `months`
+    # calendar months (from the first month with entries; months without any count as 0)
+    net = pd.concat([aggregates.monthly(files["inc"]), -aggregates.monthly(files["exp"]),
+                     -aggregates.monthly(files["inv"])], axis=1).fillna(0).sum(axis=1)
+    if net.empty: return 0.0
+    now = this_month(today)
+    start = max(pd.Period(net.index.min(), "M").ordinal, now - months + 1)
+    idx = pd.period_range(typed.month_label(start), typed.month_label(now), freq="M").astype(str)
+    return float(net.reindex(idx, fill_value=0.0).mean()) if len(idx) else 0.0
+
+def unallocated(files, df):
+    # Savings not yet put into a goal (cents): income - expenses - investments' current value - SavedSoFar
+    available = typed.cents(aggregates.total(files["inc"]) - aggregates.total(files["exp"])
+                            - aggregates.total(files["inv"], "CurrentValue"))
+    return max(0, max(0, available) - int(typed.cents(df["SavedSoFar"]).fillna(0).sum()))
+
+def _plan(df, today=None):
+    # Per-goal arrays (frame order) and the funding order
+    target = typed.cents(df["TargetAmount"]).fillna(0).to_numpy(dtype="int64")
+    saved = typed.cents(df["SavedSoFar"]).fillna(0).to_numpy(dtype="int64")
+    due_day = typed.days(df["TargetDate"])
+    due = typed.months(due_day)
+    prio = pd.to_numeric(df["Priority"], errors="coerce") if "Priority" in df.columns else pd.Series(np.nan, index=df.index)
+    prio = prio.fillna(DEFAULT_PRIORITY).to_numpy(dtype="float64")
+    has_due = due != typed.NAT
+    deadline = np.where(has_due, due_day.to_numpy(dtype="int64", na_value=typed.NAT), LAST)
+    order = np.lexsort((deadline, prio))  # by priority, then deadline
+    left = np.where(has_due, due - this_month(today) + 1, 0)  # months to the deadline, this one included
+    return {"remaining": np.maximum(target - saved, 0), "due": due, "has_due": has_due, "left": left, "order": order}
+
+def _fill(want, amount):
+    # Hand out `amount` over `want` in order: each gets what it asks for until the amount runs out
+    before = np.cumsum(want) - want
+    return np.clip(amount - before, 0, want)
+
+# ---------------------------
+# Queries
+# ---------------------------
+def project(df, monthly_surplus, today=None):
+    # Per goal (frame order): Remaining, Needed per month to meet TargetDate, Projected completion
+    # month (NaT if the surplus never gets there) and OnTrack (reached by its TargetDate)
+    if df.empty: return pd.DataFrame(columns=["Remaining", "Needed", "Projected", "OnTrack"], index=df.index)
+    p = _plan(df, today)
+    rem, order = p["remaining"], p["order"]
+    queued = np.empty_like(rem)
+    queued[order] = np.cumsum(rem[order])  # everything ahead in the queue, plus this goal
+    per_month = typed.cents(monthly_surplus)
+    if per_month > 0:
+        months = np.ceil(queued / per_month).astype("int64")
+        done = np.where(rem > 0, this_month(today) + np.maximum(months - 1, 0), this_month(today))
+    else:
+        done = np.where(rem > 0, typed.NAT, this_month(today))
+    reachable = done != typed.NAT
+    projected = pd.Series(np.where(reachable, done, typed.NAT).astype("datetime64[M]").astype("datetime64[s]"),
+                          index=df.index)
+    needed = np.where(p["has_due"], rem / np.maximum(p["left"], 1), 0.0)
+    return pd.DataFrame({
+        "Remaining": rem / 100,
+        "Needed": np.ceil(needed) / 100,
+        "Projected": projected,
+        "OnTrack": (rem == 0) | (reachable & (~p["has_due"] | (done <= p["due"]))),
+    }, index=df.index)
+
+def allocate(df, amount, today=None):
+    # Split `amount` cents over the goals: first each goal's share due this month (to stay on
+    # schedule), in queue order; then whatever is left, in queue order, until goals are full.
+    # Returns the cents added to each goal (frame order).
+    if df.empty: return np.zeros(0, dtype="int64")
+    p = _plan(df, today)
+    rem, order = p["remaining"][p["order"]], p["order"]
+    due_now = np.where(p["has_due"], -(-p["remaining"] // np.maximum(p["left"], 1)), 0)[order]  # ceil
+    first = _fill(due_now, amount)
+    rest = _fill(rem - first, amount - int(first.sum()))
+    out = np.zeros(len(df), dtype="int64")
+    out[order] = first + rest
+    return out
+
+def with_added(df, added):
+    # Records for the goals that receive money: new SavedSoFar, everything else as is
+    hit = added > 0
+    rows = df[hit].copy()
+    rows["SavedSoFar"] = (typed.cents(df["SavedSoFar"]).fillna(0).to_numpy(dtype="int64")[hit] + added[hit]) / 100
+    return rows.to_dict("records")
@@ -0,0 +1,154 @@
+# importer.py — bulk import of bank statements (CSV / OFX) into the expense ledger
+#
+# Statements are streamed in chunks, mapped onto Date,Category,Note,Amount,
+# de-duplicated by content hash against the ledger (and earlier chunks), and
+# each chunk is committed with one storage.append_records() call.
+# Rows identical in date, note and amount are counted, not collapsed: the n-th
+# such statement row is a duplicate only if the ledger has n of them already,
+# so two real STARBUCKS -4.50 on one day both get in (once). Rows without a
+# category are labeled in batch by categorizer.py.
+#
+# Usage: python importer.py statement.csv [--user NAME] [--debits-negative] [--date-col COL] ...
+import io, re, sys, argparse
+import numpy as np
+import pandas as pd
+import storage
+
+CHUNK_ROWS = 50_000
+DEFAULT_CATEGORY = "Other"
+FIELDS = ["Date", "Category", "Note", "Amount"]
+# Header names recognised for each field (case-insensitive), first match wins
+ALIASES = {
+    "Date": ["date", "transaction date", "posting date", "posted date", "booking date", "value date"],
+    "Amount": ["amount", "debit", "withdrawal", "value", "transaction amount"],
+    "Note": ["note", "description", "memo", "details", "narrative", "payee", "name", "reference"],
+    "Category": ["category"],
+}
+
+def guess_mapping(columns):
+    lower = {str(c).strip().lower(): c for c in columns}
+    mapping = {}
+    for field, names in ALIASES.items():
+        mapping[field] = next((lower[n] for n in names if n in lower), None)
+    return mapping
+
+# ---------------------------
+# Readers: yield raw chunks with Date / Category / Note / Amount columns
+# ---------------------------
+def iter_csv(src, mapping=None, chunksize=CHUNK_ROWS):
+    for chunk in pd.read_csv(src, chunksize=chunksize, dtype=str, skipinitialspace=True):
+        m = mapping or guess_mapping(chunk.columns)
+        if not m.get("Date") or not m.get("Amount"):
+            raise ValueError(f"Could not find Date/Amount columns in {list(chunk.columns)}")
+        yield pd.DataFrame({f: chunk[m[f]] if m.get(f) else None for f in FIELDS})
+
+_OFX_TAG = re.compile(r"<(/?\w+)>([^<\r\n]*)")
+
+def iter_ofx(src, chunksize=CHUNK_ROWS):
+    # OFX/QFX (SGML or XML flavour): one <STMTTRN> block per transaction
+    rows, cur = [], None
+    for line in src:
+        for tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN": cur = {}
+            elif tag == "/STMTTRN" and cur is not None:
+                rows.append({"Date": cur.get("DTPOSTED", "")[:8], "Category": None,
+                             "Note": cur.get("NAME") or cur.get("MEMO"), "Amount": cur.get("TRNAMT")})
+                cur = None
+                if len(rows) >= chunksize:
+                    yield pd.DataFrame(rows, columns=FIELDS); rows = []
+            elif cur is not None and not tag.startswith("/"):
+                cur[tag] = value.strip()
+    if rows: yield pd.DataFrame(rows, columns=FIELDS)
+
+# ---------------------------
+# Normalise + hash
+# ---------------------------
+def normalize(chunk, debits_negative=False, dayfirst=False):
+    amount = pd.to_numeric(chunk["Amount"].astype(str).str.replace(r"[^0-9.\-]", "", regex=True), errors="coerce")
+    if debits_negative: amount = amount.where(amount < 0)  # credits are not expenses
+    out = pd.DataFrame({
+        "Date": pd.to_datetime(chunk["Date"], errors="coerce", format="mixed", dayfirst=dayfirst),
+        "Category": chunk["Category"].astype(object).str.strip().replace("", None),
+        "Note": chunk["Note"].fillna("").astype(str).str.strip(),
+        "Amount": amount.abs().round(2),
+    })
+    return out[out["Date"].notna() & (out["Amount"] > 0)].reset_index(drop=True)
+
+def _content(df):
+    key = pd.DataFrame({
+        "Date": df["Date"].dt.strftime("%Y-%m-%d").fillna(""),
+        "Note": df["Note"].fillna("").astype(str),
+        "Cents": (pd.to_numeric(df["Amount"], errors="coerce").fillna(0) * 100).round().astype("int64"),
+    })
+    return pd.util.hash_pandas_object(key, index=False).to_numpy()
+
+def _hashes(df, counts):
+    # Hash of (date, note, cents, n) per row, n = equal rows before it (earlier in df, plus
+    # counts[content] from earlier chunks); returns the hashes and the updated counts
+    content = _content(df)
+    n = pd.Series(content).groupby(content).cumcount().to_numpy()
+    if len(counts): n = n + counts.reindex(content, fill_value=0).to_numpy(dtype="int64")
+    h = pd.util.hash_pandas_object(pd.DataFrame({"Content": content, "N": n}), index=False).to_numpy()
+    return h, counts.add(pd.Series(content).value_counts(), fill_value=0).astype("int64")
+
+def row_hashes(df): return _hashes(df, pd.Series(dtype="int64"))[0]
+
+# ---------------------------
+# Import
+# ---------------------------
+def import_chunks(chunks, path, debits_negative=False, dayfirst=False, progress=None):
+    # Returns (rows added, rows skipped as duplicates/invalid)
+    existing = storage.read_ledger(path)
+    seen = np.sort(row_hashes(existing)) if not existing.empty else np.array([], dtype="uint64")
+    counts = pd.Series(dtype="int64")  # content hash -> statement rows so far
+    added = skipped = 0
+    for raw in chunks:
+        df = normalize(raw, debits_negative, dayfirst)
+        skipped += len(raw) - len(df)
+        h, counts = _hashes(df, counts)
+        pos = np.searchsorted(seen, h).clip(max=max(len(seen) - 1, 0))
+        fresh = ~(seen[pos] == h) if len(seen) else np.ones(len(h), dtype=bool)
+        skipped += int((~fresh).sum())
+        df = df[fresh]
+        if not df.empty:
+            missing = df["Category"].isna()
+            if missing.any():
+                import categorizer  # only statements with unlabeled rows need it
+                guessed = categorizer.predict(path, df.loc[missing, "Note"].tolist())
+                df.loc[missing, "Category"] = [g or DEFAULT_CATEGORY for g in guessed]
+            df = df.assign(Date=df["Date"].dt.strftime("%Y-%m-%d"))
+            storage.append_records(path, df)  # one write + fsync per chunk
+            seen = np.sort(np.concatenate([seen, h[fresh]]), kind="stable")
+            added += len(df)
+        if progress: progress(added, skipped)
+    return added, skipped
+
+def import_file(src, path, name="", mapping=None, debits_negative=False, dayfirst=False, chunksize=CHUNK_ROWS,
+                progress=None):
+    # src: a path or a binary file object (e.g. a Streamlit upload)
+    name = (name or (src if isinstance(src, str) else "")).lower()
+    if name.endswith((".ofx", ".qfx")):
+        text = open(src, encoding="utf-8", errors="replace") if isinstance(src, str) \
+            else io.TextIOWrapper(src, encoding="utf-8", errors="replace")
+        with text:
+            return import_chunks(iter_ofx(text, chunksize), path, debits_negative, False, progress)
+    return import_chunks(iter_csv(src, mapping, chunksize), path, debits_negative, dayfirst, progress)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Import a bank statement into SmartSpend expenses")
+    ap.add_argument("statement")
+    ap.add_argument("--user", help="login name (default: the guest/demo ledgers)")
+    ap.add_argument("--chunksize", type=int, default=CHUNK_ROWS)
+    ap.add_argument("--debits-negative", action="store_true", help="only import negative amounts (debits)")
+    ap.add_argument("--dayfirst", action="store_true", help="dates are DD/MM/YYYY")
+    for f in FIELDS: ap.add_argument(f"--{f.lower()}-col", help=f"statement column holding {f}")
+    args = ap.parse_args()
+    files = storage.open_user(storage.user_id(args.user) if args.user else storage.GUEST)
+    mapping = None
+    if any(getattr(args, f"{f.lower()}_col") for f in FIELDS):
+        mapping = {f: getattr(args, f"{f.lower()}_col") for f in FIELDS}
+    added, skipped = import_file(args.statement, files["exp"], mapping=mapping, debits_negative=args.debits_negative,
+                                 dayfirst=args.dayfirst, chunksize=args.chunksize,
+                                 progress=lambda a, s: print(f"\r{a:,} added, {s:,} skipped", end="", file=sys.stderr))
+    print(f"\n{args.statement}: {added:,} rows added, {skipped:,} skipped", file=sys.stderr)
@@ -0,0 +1,69 @@
+# incremental.py — per-ledger reductions kept current by the storage write hook
+#
+# aggregates.py, trends.py and budgets.py each reduce a ledger once (a "view":
+# build(key) scans the typed frame into a state dict) and then absorb every
+# write as a delta (apply(key, s, records, sign), sign -1 for rows going out),
+# so reads never rescan. A delta is only right on top of the file exactly as it
+# was before that write, so storage hands the hook the pre-write stamp: state
+# that reflects any other version of the ledger (another server process wrote
+# since it was built) is dropped instead of patched, and rebuilt on the next
+# read. A rewrite drops it too.
+import os, threading
+from collections import OrderedDict
+import storage
+
+BATCH_ROWS = 64  # larger writes are applied with one groupby instead of row by row
+MAX_STATES = 1024  # (view, ledger) states kept; the least recently read is dropped and rebuilt when read again
+
+_views = {}  # view name -> (ledger file names, build, apply)
+_state = OrderedDict()  # (view name, abs ledger path) -> state dict, least recently read first; "stamp" is the ledger version it reflects
+lock = threading.RLock()  # guards all view state; always taken after the ledger's storage.path_lock
+
+def register(name, ledgers, build, apply):
+    _views[name] = (frozenset(ledgers), build, apply)
+
+def group(x): return "" if x is None or (isinstance(x, float) and x != x) else str(x)
+
+# ---------------------------
+# State
+# ---------------------------
+def get(name, path):
+    # State of a view for a ledger, (re)built if the ledger changed since
+    key = os.path.abspath(path)
+    s = _state.get((name, key))
+    if s is not None and s["stamp"] == storage.stamp(key):
+        try: _state.move_to_end((name, key))
+        except KeyError: pass  # dropped by a write meanwhile
+        return s
+    with storage.path_lock(key), lock:
+        s = _state.get((name, key))
+        before = storage.stamp(key)
+        if s is None or s["stamp"] != before:
+            s = _views[name][1](key)
+            s["stamp"] = before  # if the scan flushed queued rows, the next read rebuilds
+            _state[(name, key)] = s
+            while len(_state) > MAX_STATES: _state.popitem(last=False)
+        return s
+
+def clear(name):
+    with lock:
+        for k in [k for k in _state if k[0] == name]: del _state[k]
+
+# ---------------------------
+# Write hook (registered with storage)
+# ---------------------------
+def _on_change(event, path, records, before):
+    key = os.path.abspath(path)
+    file = os.path.basename(key)
+    with lock:
+        for name, (ledgers, _, apply) in _views.items():
+            if file not in ledgers: continue
+            s = _state.get((name, key))
+            if s is None: continue  # built lazily on first read
+            if event == "rewrite" or s["stamp"] != before:
+                del _state[(name, key)]  # not the base this write applies to: rebuild on the next read
+                continue
+            apply(key, s, records, 1 if event == "append" else -1)
+            s["stamp"] = storage.stamp(key)
+
+storage.on_change(_on_change)
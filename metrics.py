@@ -0,0 +1,108 @@
+# metrics.py — hot-path instrumentation: timers and I/O counters per rerun
+#
+# Code on the hot paths wraps its work in metrics.timer(name) and may note the
+# bytes and rows it touched:
+#     with metrics.timer("csv.read") as m:
+#         df = pd.read_csv(path)
+#         m["rows"] = len(df)
+# app.py runs each page inside metrics.rerun(page), which collects everything
+# the page's thread did into one record: kept in memory for the diagnostics
+# section of Settings and logged as one JSON line ("smartspend.metrics"
+# logger; SMARTSPEND_METRICS_LOG=<file> writes the lines to a file). Work on
+# other threads (write flusher, compaction) only counts toward process totals.
+#
+# Off unless SMARTSPEND_METRICS=1 or switched on in Settings; while off, timer()
+# returns a shared no-op context and nothing is recorded. Collection is process-wide,
+# so only the users in SMARTSPEND_ADMINS (comma-separated user ids) may switch it
+# or see process totals; everyone else sees just the runs of their own partition.
+import os, json, time, logging, threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+ENABLED = os.environ.get("SMARTSPEND_METRICS", "") not in ("", "0")
+HISTORY = 50  # finished reruns kept for the diagnostics view
+ADMINS = {u.strip() for u in os.environ.get("SMARTSPEND_ADMINS", "").split(",") if u.strip()}
+
+log = logging.getLogger("smartspend.metrics")
+if os.environ.get("SMARTSPEND_METRICS_LOG"):
+    _handler = logging.FileHandler(os.environ["SMARTSPEND_METRICS_LOG"])
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(_handler)
+    log.setLevel(logging.INFO)
+
+_NOOP = nullcontext({})  # what timer() hands out while disabled; writes to it are dropped
+_local = threading.local()  # .run: the rerun being recorded on this thread
+_recent = deque(maxlen=HISTORY)
+_totals = {}  # name -> {"calls", "ms", "bytes", "rows"} since start / reset
+_lock = threading.Lock()
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = bool(on)
+
+def is_admin(uid): return uid in ADMINS
+
+def owner(uid):
+    # Tag the rerun being recorded on this thread with the user partition it serves
+    run = getattr(_local, "run", None)
+    if run is not None: run["user"] = uid
+
+def _stat(stats, name):
+    s = stats.get(name)
+    if s is None: s = stats[name] = {"calls": 0, "ms": 0.0, "bytes": 0, "rows": 0}
+    return s
+
+def _record(name, calls, ms, nbytes, rows):
+    run = getattr(_local, "run", None)
+    targets = [_stat(run["stats"], name)] if run is not None else []
+    with _lock:
+        targets.append(_stat(_totals, name))
+        for s in targets:
+            s["calls"] += calls; s["ms"] += ms; s["bytes"] += nbytes; s["rows"] += rows
+
+@contextmanager
+def _timed(name):
+    m = {}
+    t = time.perf_counter()
+    try: yield m
+    finally: _record(name, 1, (time.perf_counter() - t) * 1000, int(m.get("bytes", 0)), int(m.get("rows", 0)))
+
+def timer(name):
+    # Time a block; set m["bytes"] / m["rows"] on the yielded dict to count I/O
+    return _timed(name) if ENABLED else _NOOP
+
+def count(name, n=1, nbytes=0, rows=0):
+    # Untimed event (cache hit, ...)
+    if ENABLED: _record(name, n, 0.0, nbytes, rows)
+
+@contextmanager
+def rerun(page):
+    # Collect one page run; st.rerun()/st.stop() unwind through here too
+    if not ENABLED:
+        yield
+        return
+    run = _local.run = {"page": page, "user": None, "at": time.time(), "stats": {}}
+    t = time.perf_counter()
+    try: yield
+    finally:
+        _local.run = None
+        run["ms"] = (time.perf_counter() - t) * 1000
+        with _lock: _recent.append(run)
+        if log.isEnabledFor(logging.INFO):
+            log.info(json.dumps({"event": "rerun", "page": page, "user": run["user"], "at": round(run["at"], 3),
+                                 "ms": round(run["ms"], 3), "stats": run["stats"]}))
+
+# ---------------------------
+# Diagnostics view data
+# ---------------------------
+def recent(user):
+    # The user's finished reruns, newest first: {"page", "user", "at", "ms", "stats": {name: {...}}}
+    with _lock: return [r for r in reversed(_recent) if r["user"] == user]
+
+def totals():
+    with _lock: return {name: dict(s) for name, s in _totals.items()}
+
+def reset():
+    with _lock:
+        _recent.clear()
+        _totals.clear()
@@ -0,0 +1,118 @@
+# pages/0_Dashboard.py — totals, SmartScore, charts and recent activity
+import streamlit as st
+import common
+import storage
+import aggregates
+import graphs
+import trends
+import forecast
+import budgets
+from activity import recent_activity
+from smartscore import compute_smartscore, goal_score, monthly_smartscore
+
+files = common.open_page("Dashboard")
+EXP_FILE, INC_FILE, INV_FILE = files["exp"], files["inc"], files["inv"]
+
+st.title("💸 SmartSpend Dashboard")
+
+# Totals and trends come from running aggregates; only the goals are read as a frame
+df_goal = storage.read_ledger(files["goal"])
+
+# ---------- CALCULATIONS (running aggregates, no ledger scans) ----------
+total_expenses = aggregates.total(EXP_FILE)
+total_income = aggregates.total(INC_FILE)
+total_investments = aggregates.total(INV_FILE, "CurrentValue")
+total_savings = max(0.0, total_income - total_expenses - total_investments)
+
+budget = st.session_state.monthly_budget
+
+# ---------- SMARTSCORE & ESTIMATED FUTURE SAVINGS ----------
+score = compute_smartscore(total_income, total_expenses, total_investments, budget, df_goal)
+
+monthly_exp = aggregates.monthly(EXP_FILE)
+monthly_inc = aggregates.monthly(INC_FILE)
+
+# Next month's savings: seasonal + trend forecast per category/source/type (fits cached until the data changes)
+next_month = forecast.savings(files, months=2).iloc[-1]
+
+# ---------- METRICS CARDS ----------
+st.subheader("📊 Overview")
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("💰 Total Income", common.currency_format(total_income))
+col2.metric("🛒 Total Expenses", common.currency_format(total_expenses))
+col3.metric("💳 Investments", common.currency_format(total_investments))
+col4.metric("💡 Savings", common.currency_format(total_savings))
+
+st.subheader("💡 SmartScore & Future Savings")
+col1, col2 = st.columns(2)
+col1.metric("SmartScore (0-100)", f"{score}")
+col2.metric("Estimated Next Month Savings", common.currency_format(next_month["Forecast"]),
+            help=f"80% range: {common.currency_format(next_month['Low'])} to {common.currency_format(next_month['High'])}")
+
+# SmartScore history: every month scored in one vectorized call
+score_history = monthly_smartscore(monthly_inc, monthly_exp, aggregates.monthly(INV_FILE), budget, goal_score(df_goal))
+if len(score_history) > 1:
+    st.line_chart(score_history)
+
+# ---------- BUDGETS (statuses kept current by the expense write hook) ----------
+st.subheader("📅 Budgets")
+budget_status = budgets.status(EXP_FILE)
+if not budget_status.empty:
+    for r in budget_status.itertuples(index=False):
+        st.progress(min(1.0, r.Used), text=f"{r.Category or 'All spending'} · this {r.Period.lower()}")
+        st.write(f"Spent: **{common.currency_format(r.Spent)}** / {common.currency_format(r.Limit)}")
+        if r.Level == "over":
+            st.error("⚠️ Over budget!")
+        elif r.Level == "warn":
+            st.warning("🔶 Close to limit.")
+        elif r.Level == "pace":
+            st.warning(f"📈 On pace for {common.currency_format(r.Projected)} by the end of the {r.Period.lower()}.")
+    if budget_status["Level"].isna().all():
+        st.success("🟢 You’re doing great!")
+else:
+    st.info("⚠️ Set a monthly budget in Settings to start tracking.")
+
+# ---------- CATEGORY BREAKDOWN PIE CHART ----------
+st.markdown("### 📌 Category Breakdown")
+# Cached per aggregate version + theme: rebuilt only after the expenses change
+fig = graphs.category_pie_for(EXP_FILE, st.session_state.get("theme", graphs.DEFAULT_THEME))
+if fig is not None:
+    st.plotly_chart(fig, use_container_width=True)
+else:
+    st.info("No expenses to show yet.")
+
+# ---------- INCOME VS EXPENSES TREND ----------
+st.markdown("### 📉 Income vs Expenses")
+t1, t2 = st.columns(2)
+bucket = t1.selectbox("Bucket", list(trends.FREQS), index=2, key="trend_bucket")
+span = t2.selectbox("Window", trends.WINDOWS, index=2, key="trend_window")
+start, end = trends.window(span)
+# One point per bucket (zero-filled), resampled from cached daily sums
+merged = trends.compare([(INC_FILE, "Income"), (EXP_FILE, "Expenses")], trends.FREQS[bucket], start, end)
+st.line_chart(merged)
+
+# ---------- RECENT ACTIVITY ----------
+st.markdown("### 🔍 Recent Activity")
+# Newest rows across all ledgers via a heap merge of per-ledger date-sorted streams
+if "activity_rows" not in st.session_state: st.session_state.activity_rows = 10
+combined = recent_activity([(INC_FILE, "Income"), (EXP_FILE, "Expense"), (INV_FILE, "Investment")],
+                           k=st.session_state.activity_rows)
+
+if not combined.empty:
+    st.dataframe(combined, use_container_width=True, column_config={"Id": None})
+    if len(combined) == st.session_state.activity_rows and st.button("⬇️ Load more"):
+        st.session_state.activity_rows += 10
+        st.rerun()
+else:
+    st.info("No data recorded yet.")
+
+# ---------- ACHIEVEMENTS & BADGES ----------
+st.subheader("🏅 Achievements & Milestones")
+if total_savings >= 10000:
+    st.success("🎉 Saved First 10k!")
+if score >= 80:
+    st.success("💪 Excellent SmartScore!")
+if not df_goal.empty and all(df_goal["SavedSoFar"] >= df_goal["TargetAmount"]):
+    st.success("🏆 All Goals Completed!")
+if total_expenses > total_income:
+    st.warning("⚠️ Expenses exceeded income this month!")
@@ -0,0 +1,44 @@
+# pages/1_Add_expense.py — Add Expense
+import streamlit as st
+from datetime import date
+import common
+import storage
+
+files = common.open_page("Add Expense")
+EXP_FILE = files["exp"]  # the only ledger this page touches
+LATEST_ROWS = 20
+common.warm_categorizer(EXP_FILE)  # fit / catch up in the background, before "✨ Auto" is submitted
+
+st.header("➕ Add Expense")
+
+common.back_button()
+
+with st.form("add_exp", clear_on_submit=True):
+    col1, col2 = st.columns(2)
+    with col1:
+        exp_date = st.date_input("Date", value=date.today())
+        exp_desc = st.text_input("Note (e.g., Coffee, Rent)")
+    with col2:
+        exp_amount = st.number_input("Amount", min_value=0.0, format="%.2f")
+        exp_cat = st.selectbox("Category", ["✨ Auto","Food","Transport","Shopping","Bills","Entertainment","Health","Education","Other"])
+
+    submitted = st.form_submit_button("💾 Save Expense")
+
+if submitted:
+    if exp_desc and exp_amount > 0:
+        if exp_cat == "✨ Auto":
+            # Learned from your past Note -> Category pairs
+            import categorizer
+            exp_cat = categorizer.predict_one(EXP_FILE, exp_desc) or "Other"
+            st.info(f"Auto-categorized as **{exp_cat}**")
+        new = {"Date": exp_date, "Category": exp_cat, "Note": exp_desc, "Amount": float(exp_amount)}
+        storage.submit(EXP_FILE, new)  # queued; shares one append + fsync with concurrent submissions
+
+        st.success(f"Added successfully — {common.currency_format(float(exp_amount))}")
+
+        # Newest rows only: a window decoded from the cached ledger, not the whole table
+        st.markdown("### ✅ Latest expenses")
+        st.dataframe(storage.recent(EXP_FILE, LATEST_ROWS).reset_index(drop=True), use_container_width=True,
+                     column_config={"Id": None})
+    else:
+        st.warning("Please enter a note/description and an amount greater than 0.")
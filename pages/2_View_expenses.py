@@ -0,0 +1,79 @@
+# pages/2_View_expenses.py — View Expenses (paged; select rows to edit or delete them)
+import streamlit as st
+from datetime import date
+import common
+import storage
+import aggregates
+
+files = common.open_page("View Expenses")
+EXP_FILE = files["exp"]
+
+PAGE_SIZES = [25, 50, 100, 250]
+SORTS = {"Date": "Date", "Amount": "Amount", "Category": "Category", "Note": "Note"}
+
+st.header("📋 View Expenses")
+common.back_button()
+
+if aggregates.count(EXP_FILE) == 0:
+    st.info("No expenses yet.")
+    st.stop()
+
+# ---------- FILTERS / SORT (categories come from the aggregates, no scan) ----------
+f1, f2, f3, f4, f5 = st.columns([3, 3, 2, 2, 1])
+dates = f1.date_input("Date range", value=(), max_value=date(2100, 1, 1), key="exp_dates")
+cats = f2.multiselect("Categories", sorted(aggregates.by_group(EXP_FILE).index), key="exp_cats")
+sort = f3.selectbox("Sort by", list(SORTS), key="exp_sort")
+descending = f4.selectbox("Order", ["Newest / largest first", "Oldest / smallest first"], key="exp_order") \
+    .startswith("Newest")
+size = f5.selectbox("Rows", PAGE_SIZES, index=1, key="exp_size")
+
+date_from = dates[0] if len(dates) > 0 else None
+date_to = dates[1] if len(dates) > 1 else None
+view = (date_from, date_to, tuple(cats), sort, descending, size)
+if st.session_state.get("exp_view") != view:  # new filters: back to the first window
+    st.session_state.exp_view = view
+    st.session_state.exp_offset = 0
+offset = st.session_state.exp_offset
+
+# Only this window leaves storage (an indexed query on SQLite, a cached sort order on CSV)
+shown, total = storage.page(EXP_FILE, SORTS[sort], descending, date_from, date_to,
+                            {"Category": cats} if cats else None, offset, size)
+shown = shown.reset_index(drop=True)
+
+if total == 0:
+    st.info("No expenses match these filters.")
+    st.stop()
+
+# Rows are addressed by their record Id, never by position, so the sort
+# order shown here cannot point an action at the wrong row
+event = st.dataframe(shown, use_container_width=True, hide_index=True, column_config={"Id": None},
+                     on_select="rerun", selection_mode="multi-row", key=f"exp_table_{hash(view)}_{offset}")
+
+p1, p2, p3 = st.columns([1, 2, 1])
+if p1.button("⬅️ Previous", disabled=offset == 0):
+    st.session_state.exp_offset = max(0, offset - size)
+    st.rerun()
+p2.markdown(f"<div style='text-align:center;'>Rows {offset + 1:,}–{offset + len(shown):,} of {total:,}</div>",
+            unsafe_allow_html=True)
+if p3.button("Next ➡️", disabled=offset + size >= total):
+    st.session_state.exp_offset = offset + size
+    st.rerun()
+
+picked = shown.iloc[event.selection.rows]
+if picked.empty:
+    st.caption("Select rows in the table to edit or delete them.")
+else:
+    st.markdown(f"**{len(picked)} selected** — edit the cells below, or delete the rows.")
+    edited = st.data_editor(picked, hide_index=True, use_container_width=True, disabled=["Id"],
+                            column_config={"Id": None, "Date": st.column_config.DateColumn("Date")},
+                            key=f"exp_edit_{'-'.join(map(str, picked['Id']))}")
+    c1, c2 = st.columns(2)
+    if c1.button("💾 Save changes"):
+        changed = edited[(edited.astype(str) != picked.astype(str)).any(axis=1)]
+        n = storage.update_records(EXP_FILE, changed.to_dict("records")) if not changed.empty else 0
+        st.success(f"Updated {n} row(s).")
+        st.rerun()
+    if c2.button("🗑️ Delete selected"):
+        n = storage.delete_records(EXP_FILE, picked["Id"].tolist())  # one tombstone per row, one write
+        st.success(f"Deleted {n} row(s).")
+        st.rerun()
@@ -0,0 +1,9 @@
+# pages/3_Insights.py — AI Coach (insights & coaching, placeholder)
+import streamlit as st
+import common
+
+files = common.open_page("AI Coach")
+
+st.header("🤖 AI Coach (Placeholder)")
+st.write("Integration with a chatbot coming soon.")
+common.back_button()
@@ -0,0 +1,92 @@
+# pages/4_Settings.py — Settings
+import streamlit as st
+import pandas as pd
+import common
+import metrics
+import aggregates
+import budgets
+
+files = common.open_page("Settings")
+CATEGORIES = ["Food","Transport","Shopping","Bills","Entertainment","Health","Education","Other"]
+
+st.header("⚙️ Settings")
+common.back_button()
+
+c1,c2 = st.columns(2)
+with c1:
+    cur = st.selectbox("Currency", ["SAR","USD","INR","EUR","CAD"], index=["SAR","USD","INR","EUR","CAD"].index(st.session_state.currency))
+    st.session_state.currency = cur
+with c2:
+    mb = st.number_input("Monthly Budget", min_value=0.0, format="%.2f", value=st.session_state.monthly_budget)
+    if st.button("Save Settings"):
+        st.session_state.monthly_budget = float(mb)
+        settings = common.load_settings(files)
+        settings["currency"] = st.session_state.currency
+        settings["monthly_budget"] = float(mb)
+        common.save_settings(files, settings)
+        st.success("Settings saved ✔️")
+        st.rerun()
+
+# ---------- BUDGETS PER CATEGORY / PERIOD (alerts are evaluated on each expense write, see budgets.py) ----------
+st.markdown("---")
+st.subheader("📅 Budgets")
+st.caption("Limits per category and week / month / year, on top of the overall monthly budget. Leave Category empty for all spending.")
+settings = common.load_settings(files)
+categories = sorted(set(CATEGORIES) | {c for c in aggregates.by_group(files["exp"]).index if c})
+rows = st.data_editor(
+    pd.DataFrame(settings.get("budgets", []), columns=["Category", "Period", "Amount"]),
+    num_rows="dynamic", hide_index=True, use_container_width=True, key="budget_rows",
+    column_config={
+        "Category": st.column_config.SelectboxColumn("Category", options=[budgets.ALL] + categories),
+        "Period": st.column_config.SelectboxColumn("Period", options=list(budgets.PERIODS), required=True),
+        "Amount": st.column_config.NumberColumn("Amount", min_value=0.0, format="%.2f"),
+    })
+if st.button("Save Budgets"):
+    settings["budgets"] = budgets.clean(rows.to_dict("records"))
+    common.save_settings(files, settings)
+    st.success("Budgets saved ✔️")
+    st.rerun()
+
+# ---------- DIAGNOSTICS (timers and I/O counters per page run, see metrics.py) ----------
+st.markdown("---")
+st.subheader("🩺 Diagnostics")
+admin = metrics.is_admin(st.session_state.uid)  # switching and process totals cover every user on the server
+if admin:
+    on = st.toggle("Collect timings and I/O counters", value=metrics.ENABLED,
+                   help="Process-wide; costs next to nothing while off.")
+    if on != metrics.ENABLED:
+        metrics.enable(on)
+        st.rerun()
+
+runs = metrics.recent(st.session_state.uid)
+if not runs:
+    st.caption("No page runs recorded yet — switch collection on and open a few pages." if admin else
+               "No page runs of yours recorded — collection is switched on by the server's admins.")
+else:
+    def _sum(stats, field, prefix=""):
+        return sum(s[field] for name, s in stats.items() if name.startswith(prefix))
+    st.markdown("**Recent page runs** (newest first)")
+    st.dataframe(pd.DataFrame([{
+        "Page": r["page"],
+        "Time (ms)": round(r["ms"], 1),
+        "Read (KB)": round((_sum(r["stats"], "bytes", "csv.read") + _sum(r["stats"], "bytes", "snapshot.")
+                            + _sum(r["stats"], "bytes", "aggregate.summary_read")) / 1024, 1),
+        "Written (KB)": round((_sum(r["stats"], "bytes", "csv.append") + _sum(r["stats"], "bytes", "csv.rewrite")) / 1024, 1),
+        "Rows scanned": _sum(r["stats"], "rows", "csv.read") + _sum(r["stats"], "rows", "snapshot.")
+                        + _sum(r["stats"], "rows", "sqlite.load"),
+    } for r in runs]), hide_index=True, use_container_width=True)
+
+    pick = st.selectbox("Breakdown of run", range(len(runs)),
+                        format_func=lambda i: f"{runs[i]['page']} — {runs[i]['ms']:.1f} ms")
+    breakdown = pd.DataFrame.from_dict(runs[pick]["stats"], orient="index")
+    if not breakdown.empty:
+        st.dataframe(breakdown.sort_values("ms", ascending=False).round(2), use_container_width=True)
+
+totals = metrics.totals() if admin else None
+if totals:
+    st.markdown("**Process totals** (all sessions, background writers included)")
+    st.dataframe(pd.DataFrame.from_dict(totals, orient="index").sort_values("ms", ascending=False).round(2),
+                 use_container_width=True)
+    if st.button("Reset diagnostics"):
+        metrics.reset()
+        st.rerun()
@@ -0,0 +1,37 @@
+# pages/5_Add_income.py — Add Income
+import streamlit as st
+from datetime import date
+import common
+import storage
+
+files = common.open_page("Add Income")
+INC_FILE = files["inc"]
+
+st.header("➕ Add Income")
+
+common.back_button()
+
+with st.form("add_inc", clear_on_submit=True):
+    inc_date = st.date_input("Date", value=date.today())
+    inc_source = st.text_input("Source (e.g., Salary, Business)")
+    inc_amount = st.number_input("Amount", min_value=0.0, format="%.2f")
+    submitted = st.form_submit_button("Add Income")
+
+    if submitted:
+        if inc_source.strip() != "" and inc_amount > 0:
+            # Prepare new entry with consistent date format
+            new_entry = {
+                "Date": inc_date.strftime("%Y-%m-%d"),
+                "Source": inc_source.strip(),
+                "Amount": float(inc_amount)
+            }
+
+            # Queue the entry; it is on disk when submit() returns
+            storage.submit(INC_FILE, new_entry)
+
+            st.success(f"Income of {common.currency_format(inc_amount)} from '{inc_source}' added ✅")
+
+            # Go back to dashboard immediately
+            common.go("Dashboard")
+        else:
+            st.warning("Please enter a valid source and amount greater than 0.")
@@ -0,0 +1,55 @@
+# pages/6_Add_investment.py — Add Investment, portfolio value and performance
+import streamlit as st
+from datetime import date
+import common
+import storage
+import trends
+import graphs
+import portfolio
+
+files = common.open_page("Add Investment")
+INV_FILE = files["inv"]
+
+st.header("➕ Add Investment")
+common.back_button()
+
+with st.form("add_inv", clear_on_submit=True):
+    inv_date = st.date_input("Date", value=date.today())
+    inv_type = st.selectbox("Investment Type", ["Stocks","Mutual Funds","Crypto","Gold","Real Estate","Other"])
+    inv_amount = st.number_input("Amount Invested", min_value=0.0, format="%.2f")
+    inv_current = st.number_input("Current Value (optional)", min_value=0.0, format="%.2f")
+    submitted = st.form_submit_button("Add Investment")
+    if submitted:
+        cur_val = float(inv_current) if inv_current > 0 else float(inv_amount)
+        new = {"Date": inv_date, "Type": inv_type, "Amount": float(inv_amount), "CurrentValue": cur_val}
+        storage.submit(INV_FILE, new)
+        st.success("Investment added ✅")
+        common.go("Dashboard")
+
+# ---------- PORTFOLIO (valuation history and time-weighted returns, see portfolio.py) ----------
+st.markdown("---")
+st.subheader("📈 Portfolio")
+last = portfolio.last_snapshot(files)
+c1, c2 = st.columns([3, 1])
+c1.caption(f"Valued up to {last:%Y-%m-%d} from the local price file." if last is not None
+           else "No valuations yet — take a snapshot to start tracking performance.")
+if c2.button("📸 Snapshot today"):
+    portfolio.snapshot(files)
+    st.rerun()
+
+if last is not None:
+    span = st.selectbox("Window", trends.WINDOWS, index=2, key="portfolio_window")
+    start, end = trends.window(span)
+    m1, m2 = st.columns(2)
+    m1.metric("Portfolio value", common.currency_format(portfolio.value(files)))
+    m2.metric("Time-weighted return", f"{portfolio.twr(files, start, end) * 100:+.2f}%",
+              help="Contributions and withdrawals are taken out, so this is the return of the holdings themselves.")
+    perf = portfolio.performance(files, start, end)
+    if len(perf) > 1:
+        st.line_chart(perf["Value"])
+    alloc = portfolio.allocation(files)
+    if not alloc.empty:
+        st.markdown("**Allocation by type**")
+        st.plotly_chart(graphs.category_pie(alloc.rename(columns={"Value": "Amount"}).reset_index(), "Type",
+                                            st.session_state.get("theme", graphs.DEFAULT_THEME)),
+                        use_container_width=True)
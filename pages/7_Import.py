@@ -0,0 +1,37 @@
+# pages/7_Import.py — Import Bank Statement
+import streamlit as st
+import pandas as pd
+import common
+import importer
+
+files = common.open_page("Import")
+EXP_FILE = files["exp"]
+common.warm_categorizer(EXP_FILE)  # labels rows without a category; fit in the background meanwhile
+
+st.header("📥 Import Bank Statement")
+common.back_button()
+
+up = st.file_uploader("Statement file (CSV or OFX/QFX)", type=["csv","ofx","qfx"])
+if up is not None:
+    mapping = None
+    if up.name.lower().endswith(".csv"):
+        # Map statement columns onto Date / Category / Note / Amount (header row only)
+        cols = list(pd.read_csv(up, nrows=0).columns)
+        up.seek(0)
+        guess = importer.guess_mapping(cols)
+        options = ["—"] + cols
+        mapping = {}
+        for field, col in zip(importer.FIELDS, st.columns(len(importer.FIELDS))):
+            choice = col.selectbox(field, options, index=options.index(guess[field]) if guess[field] else 0)
+            mapping[field] = None if choice == "—" else choice
+    debits_negative = st.checkbox("Debits are negative amounts (skip credits)")
+    dayfirst = st.checkbox("Dates are day-first (DD/MM/YYYY)")
+    if st.button("📥 Import"):
+        if mapping and not (mapping["Date"] and mapping["Amount"]):
+            st.warning("Pick the Date and Amount columns first.")
+        else:
+            status = st.empty()
+            added, skipped = importer.import_file(
+                up, EXP_FILE, name=up.name, mapping=mapping, debits_negative=debits_negative, dayfirst=dayfirst,
+                progress=lambda a, s: status.write(f"{a:,} added, {s:,} skipped…"))
+            st.success(f"Imported {added:,} expenses ({skipped:,} skipped as duplicates or invalid) ✅")
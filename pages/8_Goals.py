@@ -0,0 +1,124 @@
+# pages/8_Goals.py — Goals
+import streamlit as st
+import numpy as np
+from datetime import date
+import common
+import storage
+import typed
+import goals
+
+files = common.open_page("Goals")
+EXP_FILE, INC_FILE, INV_FILE, GOAL_FILE = files["exp"], files["inc"], files["inv"], files["goal"]
+
+st.header("🎯 Goals")
+
+common.back_button()
+
+# --- Create / Update Goal ---
+st.subheader("➕ Create / Update Goal")
+g_name = st.text_input("Goal Name (e.g., New Phone)", key="goal_name")
+g_target = st.number_input("Target Amount", min_value=0.0, format="%.2f", key="goal_target")
+g_saved = st.number_input("Already Saved", min_value=0.0, format="%.2f", key="goal_saved")
+g_date = st.date_input("Target Date", value=date.today(), key="goal_date")
+g_priority = st.selectbox("Priority", list(goals.PRIORITIES), index=1, key="goal_priority")
+
+if st.button("Create / Update Goal"):
+    # Goals are keyed by Name: appending a row with an existing name updates that goal
+    storage.submit(GOAL_FILE, {
+        "Name": g_name,
+        "TargetAmount": g_target,
+        "SavedSoFar": g_saved,
+        "TargetDate": g_date.strftime("%Y-%m-%d"),
+        "Priority": goals.PRIORITIES[g_priority]
+    })
+    st.success("Goal saved.")
+    st.rerun()
+
+# --- Load latest data for allocation ---
+df_goals = storage.read_ledger(GOAL_FILE)
+
+# --- Available savings and remaining allocation ---
+def remaining(goal_rows):
+    # Savings not yet allocated to a goal, from the ledgers as they are now
+    return typed.money(goals.unallocated(files, goal_rows))
+
+def commit(plan):
+    # plan(goal_rows, left_cents) -> cents added per goal; re-run on fresh rows at commit time, so
+    # two sessions allocating at once cannot both spend the same savings. One append for all goals.
+    def fn(goal_rows):
+        added = plan(goal_rows, goals.unallocated(files, goal_rows))
+        if not added.any(): raise ValueError("Nothing left to allocate")
+        return goals.with_added(goal_rows, added)
+    storage.transact(GOAL_FILE, fn, watch=(EXP_FILE, INC_FILE, INV_FILE))
+
+remaining_savings = remaining(df_goals)
+
+# --- Display Goals: projections for all goals in one vectorized pass ---
+if not df_goals.empty:
+    st.subheader("📌 Your Goals")
+    monthly = goals.surplus(files)
+    plan = goals.project(df_goals, monthly)
+    by_priority = {v: k for k, v in goals.PRIORITIES.items()}
+    table = df_goals.assign(
+        Progress=(df_goals["SavedSoFar"] / df_goals["TargetAmount"].where(df_goals["TargetAmount"] > 0)).fillna(1.0).clip(0, 1),
+        Priority=df_goals["Priority"].fillna(goals.DEFAULT_PRIORITY).map(by_priority),
+    ).join(plan)
+    st.dataframe(table, hide_index=True, use_container_width=True,
+                 column_order=["Name", "Priority", "Progress", "SavedSoFar", "TargetAmount", "TargetDate",
+                               "Needed", "Projected", "OnTrack"],
+                 column_config={
+                     "Progress": st.column_config.ProgressColumn("Progress", min_value=0.0, max_value=1.0),
+                     "SavedSoFar": st.column_config.NumberColumn("Saved", format="%.2f"),
+                     "TargetAmount": st.column_config.NumberColumn("Target", format="%.2f"),
+                     "TargetDate": st.column_config.DateColumn("Target Date"),
+                     "Needed": st.column_config.NumberColumn("Needed / month", format="%.2f"),
+                     "Projected": st.column_config.DateColumn("Projected", format="MMM YYYY"),
+                     "OnTrack": st.column_config.CheckboxColumn("On track"),
+                 })
+    st.caption(f"Projections fund goals by priority, then deadline, from your average monthly surplus of "
+               f"{common.currency_format(monthly)}. Unallocated savings: {common.currency_format(remaining_savings)}")
+
+    # --- Auto-allocate: split savings by deadline and priority, one write for all goals ---
+    st.subheader("⚡ Auto-allocate")
+    c1, c2 = st.columns(2)
+    auto_amt = c1.number_input("Amount to allocate", min_value=0.0, max_value=remaining_savings,
+                               value=remaining_savings, format="%.2f", key="auto_amt")
+    if c2.button("Auto-allocate"):
+        if auto_amt <= 0:
+            st.warning("Enter an amount greater than 0.")
+        else:
+            try:
+                commit(lambda goal_rows, left: goals.allocate(goal_rows, min(typed.cents(auto_amt), left)))
+            except ValueError as e:
+                st.error(f"⚠️ {e}")
+            else:
+                st.success(f"Allocated {common.currency_format(auto_amt)} across your goals ✅")
+                st.rerun()
+
+    # --- Manual allocation to one goal ---
+    st.subheader("➕ Add to a Goal")
+    c1, c2 = st.columns(2)
+    name = c1.selectbox("Goal", df_goals["Name"].tolist(), key="add_goal")
+    add_amt = c2.number_input("Amount", min_value=0.0, max_value=remaining_savings, format="%.2f", key="add_amt")
+    if st.button(f"Add to {name}"):
+        if add_amt <= 0:
+            st.warning("Enter an amount greater than 0.")
+        elif add_amt > remaining_savings:
+            st.error(
+                f"⚠️ You don’t have enough remaining savings! You can allocate up to {common.currency_format(remaining_savings)}"
+            )
+        else:
+            def to_goal(goal_rows, left):
+                if typed.cents(add_amt) > left:
+                    raise ValueError(f"You can allocate up to {common.currency_format(typed.money(left))}")
+                if not (goal_rows["Name"] == name).any(): raise ValueError(f"Goal '{name}' no longer exists")
+                return np.where(goal_rows["Name"] == name, typed.cents(add_amt), 0)
+            try:
+                commit(to_goal)
+            except ValueError as e:
+                st.error(f"⚠️ {e}")
+            else:
+                st.success(f"Added {common.currency_format(add_amt)} to {name} ✅")
+                st.rerun()
+else:
+    st.info("No goals yet. Create one above to start saving for your future!")
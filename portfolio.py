@@ -0,0 +1,269 @@
+# portfolio.py — investment valuation history and portfolio performance
+#
+# valuations.csv (per user, append-only) is a time series per holding: rows of
+# Date, Holding (the investment's record Id), Type, Value and Flow. A holding's
+# last Value carries forward until its next row, so a snapshot only appends the
+# holdings whose value changed. Flow is money moved in or out with that row: its
+# Value when a holding is first valued (a gain before that day is not portfolio
+# return), minus its last value when it disappears from investments.csv.
+#
+# Snapshots are priced offline from a local price file (PRICE_FILE, columns
+# Date, Symbol, Price, where Symbol is an investment Type — "Gold", or an index
+# standing in for "Stocks"): a holding is worth Amount x price on the day /
+# price on its purchase date, with the last known price on days without one.
+# Types without a price series keep the holding's CurrentValue.
+#
+# Queries never build a days x holdings matrix: every row's change against the
+# holding's previous value is summed per day and cumulated, which gives the
+# portfolio (or per-Type) value on every snapshot day in one pass over the rows.
+# Time-weighted returns chain (value - flow) / previous value across those days
+# into a growth index, so the return between any two dates is a ratio of two
+# lookups. Results are cached per valuations ledger until it changes.
+#
+# Usage: python portfolio.py [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--users UID ...]   (daily snapshots)
+import os, argparse, threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import storage
+import typed
+
+PRICE_FILE = os.environ.get("SMARTSPEND_PRICES", "prices.csv")
+CHUNK_DAYS = 256  # snapshot days valued per pass (bounds memory on long backfills)
+MAX_LEDGERS = 256  # valuations ledgers whose daily series are kept (least recently used dropped)
+
+_prices = {"stamp": None, "series": {}}
+_prices_lock = threading.Lock()
+_daily = OrderedDict()  # abs valuations path -> (stamp, {"days", "value", "flow", "growth", "types", "by_type"}), LRU
+_lock = threading.Lock()
+
+# ---------------------------
+# Prices
+# ---------------------------
+def prices():
+    # {symbol: (day numbers ascending, prices)} from PRICE_FILE, reloaded when the file changes
+    try:
+        st = os.stat(PRICE_FILE)
+    except FileNotFoundError:
+        return {}
+    with _prices_lock:
+        if _prices["stamp"] != (st.st_mtime_ns, st.st_size):
+            df = pd.read_csv(PRICE_FILE)
+            day = typed.days(df["Date"]).to_numpy(dtype="int64", na_value=typed.NAT)
+            price = pd.to_numeric(df["Price"], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            ok = (day != typed.NAT) & (price > 0)
+            frame = pd.DataFrame({"Symbol": df["Symbol"].astype(str).to_numpy()[ok], "Day": day[ok], "Price": price[ok]})
+            frame = frame.drop_duplicates(["Symbol", "Day"], keep="last").sort_values(["Symbol", "Day"])
+            _prices["series"] = {sym: (g["Day"].to_numpy(), g["Price"].to_numpy()) for sym, g in frame.groupby("Symbol")}
+            _prices["stamp"] = (st.st_mtime_ns, st.st_size)
+        return _prices["series"]
+
+def _asof(series, days):
+    # Last known price on each day (the first price for days before the series starts)
+    d, p = series
+    return p[np.clip(np.searchsorted(d, days, side="right") - 1, 0, len(p) - 1)]
+
+# ---------------------------
+# Snapshots (writes)
+# ---------------------------
+def _latest(val):
+    # Latest (Value cents, Type) per holding of a typed valuations frame, and the latest snapshot day
+    if val.empty: return {}, typed.NAT
+    day = val["Date"].to_numpy(dtype="int64", na_value=typed.NAT)
+    h = val["Holding"].to_numpy(dtype="int64")
+    order = np.lexsort((day, h))  # stable: the row appended last wins within a day
+    last = order[np.r_[h[order][1:] != h[order][:-1], True]]
+    values = val["Value"].fillna(0).to_numpy(dtype="int64")[last]
+    types = typed.text(val["Type"]).to_numpy(dtype=object)[last]
+    return {int(k): (int(v), t) for k, v, t in zip(h[last], values, types)}, int(day.max())
+
+def _holdings(inv):
+    # Live holdings of a typed investments frame: ids, types, purchase days, invested and current cents
+    amount = inv["Amount"].fillna(0).to_numpy(dtype="int64")
+    return {"id": inv["Id"].to_numpy(dtype="int64"),
+            "type": typed.text(inv["Type"]).fillna("").to_numpy(dtype=object),
+            "bought": inv["Date"].to_numpy(dtype="int64", na_value=typed.NAT),  # NAT: held from the start
+            "amount": amount,
+            "current": np.where(inv["CurrentValue"].isna().to_numpy(dtype=bool), amount,
+                                inv["CurrentValue"].fillna(0).to_numpy(dtype="int64"))}
+
+def _values(h, days, series):
+    # days x holdings values in cents: priced types follow their price, the rest keep CurrentValue
+    v = np.broadcast_to(h["current"].astype("float64"), (len(days), len(h["id"]))).copy()
+    for t in set(h["type"]) & set(series):
+        cols = np.flatnonzero(h["type"] == t)
+        base = _asof(series[t], h["bought"][cols])
+        v[:, cols] = h["amount"][cols] * (_asof(series[t], days)[:, None] / base)
+    return np.round(v).astype("int64")
+
+def snapshot(files, dates=None):
+    # Value every live holding on each of `dates` (default: today) and append, in one write, the
+    # rows whose value changed. Days on or before the latest stored snapshot are skipped.
+    # Returns the number of rows written.
+    path = files["val"]
+    when = pd.Series(list(dates) if dates is not None else [pd.Timestamp.today().normalize()])
+    days = np.unique(typed.days(when).to_numpy(dtype="int64", na_value=typed.NAT))
+    with storage.write_lock(path):
+        latest, last_day = _latest(storage.read_typed(path))
+        days = days[(days != typed.NAT) & (days > last_day)]
+        if not len(days): return 0
+        h = _holdings(storage.read_typed(files["inv"]))
+        series = prices()
+        known = np.array([k in latest for k in h["id"].tolist()], dtype=bool)
+        prev = np.array([latest[k][0] if k in latest else 0 for k in h["id"].tolist()], dtype="int64")
+        parts = []
+        # Holdings valued before that are gone from investments.csv: valued at 0, their value flows out
+        live = set(h["id"].tolist())
+        gone = [(k, v, t) for k, (v, t) in latest.items() if k not in live and v != 0]
+        if gone:
+            parts.append(pd.DataFrame({"Day": days[0], "Holding": [k for k, _, _ in gone], "Type": [t for _, _, t in gone],
+                                       "Value": 0, "Flow": [-v for _, v, _ in gone]}))
+        for lo in range(0, len(days), CHUNK_DAYS):
+            chunk = days[lo:lo + CHUNK_DAYS]
+            held = h["bought"][None, :] <= chunk[:, None]
+            v = _values(h, chunk, series)
+            # previous value of each cell: the row above, or the stored value for the chunk's first day
+            before = np.vstack([prev[None, :], v[:-1]])
+            valued = np.vstack([known[None, :], held[:-1] | known[None, :]])
+            first = held & ~valued
+            i, j = np.nonzero(held & (first | (v != before)))
+            parts.append(pd.DataFrame({"Day": chunk[i], "Holding": h["id"][j], "Type": h["type"][j],
+                                       "Value": v[i, j], "Flow": np.where(first[i, j], v[i, j], 0)}))
+            seen = held.any(axis=0)
+            prev = np.where(seen, v[-1], prev)
+            known |= seen
+        rows = pd.concat(parts, ignore_index=True)
+        if rows.empty: return 0
+        rows = rows.sort_values("Day", kind="stable")
+        storage.append_records(path, pd.DataFrame({
+            "Date": rows["Day"].to_numpy(dtype="int64").astype("datetime64[D]").astype(str),
+            "Holding": rows["Holding"].to_numpy(), "Type": rows["Type"].to_numpy(),
+            "Value": rows["Value"].to_numpy() / 100, "Flow": rows["Flow"].to_numpy() / 100}))
+        return len(rows)
+
+# ---------------------------
+# Performance engine (reads)
+# ---------------------------
+def _build(val):
+    # Per snapshot day: portfolio value and flow (cents), TWR growth index, value per type
+    if val.empty:
+        return {"days": np.zeros(0, dtype="int64"), "value": np.zeros(0), "flow": np.zeros(0),
+                "growth": np.zeros(0), "types": [], "by_type": np.zeros((0, 0))}
+    day = val["Date"].to_numpy(dtype="int64", na_value=typed.NAT)
+    ok = day != typed.NAT
+    day, val = day[ok], val[ok]
+    h = val["Holding"].to_numpy(dtype="int64")
+    v = val["Value"].fillna(0).to_numpy(dtype="int64")
+    order = np.lexsort((day, h))
+    hs, vs = h[order], v[order]
+    prev = np.r_[0, vs[:-1]]
+    prev[np.r_[True, hs[1:] != hs[:-1]]] = 0  # each holding's first row changes the total by its full value
+    delta = np.empty_like(v)
+    delta[order] = vs - prev
+    days, code = np.unique(day, return_inverse=True)
+    value = np.cumsum(np.bincount(code, weights=delta, minlength=len(days)))
+    flow = np.bincount(code, weights=val["Flow"].fillna(0).to_numpy(dtype="int64"), minlength=len(days))
+    before = np.r_[0.0, value[:-1]]
+    ret = np.where(before > 0, (value - flow) / np.where(before > 0, before, 1.0), 1.0)  # 1 + return of each day
+    types = val["Type"].cat.codes.to_numpy()
+    names = list(val["Type"].cat.categories)
+    if (types < 0).any():  # rows without a type
+        names.append("")
+        types = np.where(types < 0, len(names) - 1, types)
+    by_type = np.cumsum(np.bincount(code * len(names) + types, weights=delta, minlength=len(days) * len(names))
+                        .reshape(len(days), len(names)), axis=0)
+    return {"days": days, "value": value, "flow": flow, "growth": np.cumprod(ret), "types": names, "by_type": by_type}
+
+def _get(files):
+    path = os.path.abspath(files["val"])
+    stamp = storage.stamp(path)
+    with _lock:
+        hit = _daily.get(path)
+        if hit and hit[0] == stamp:
+            _daily.move_to_end(path)
+            return hit[1]
+    d = _build(storage.read_typed(path))
+    with _lock:
+        _daily[path] = (stamp, d)
+        _daily.move_to_end(path)
+        while len(_daily) > MAX_LEDGERS: _daily.popitem(last=False)
+    return d
+
+def _at(d, dates):
+    # Index of the last snapshot day on or before each date (-1: before the first snapshot)
+    days = typed.days(pd.Series(dates)).to_numpy(dtype="int64", na_value=typed.NAT)
+    return np.searchsorted(d["days"], days, side="right") - 1
+
+def _many(x):
+    # (list of dates, whether a single date was given); None is today
+    if not pd.api.types.is_list_like(x): return [pd.Timestamp(x if x is not None else pd.Timestamp.today())], True
+    return [pd.Timestamp(v) for v in x], False
+
+def _dates(days): return pd.DatetimeIndex(days.astype("datetime64[D]").astype("datetime64[s]"), name="Date")
+
+def last_snapshot(files):
+    # Latest snapshot day (Timestamp), None before the first
+    d = _get(files)
+    return _dates(d["days"][-1:])[0] if len(d["days"]) else None
+
+def history(files, start=None, end=None, by=None):
+    # Snapshot days in [start, end]: Value and Flow, or with by="Type" the value of each type
+    d = _get(files)
+    lo = 0 if start is None else np.searchsorted(d["days"], typed.days(pd.Timestamp(start)))
+    hi = len(d["days"]) if end is None else np.searchsorted(d["days"], typed.days(pd.Timestamp(end)), side="right")
+    idx = _dates(d["days"][lo:hi])
+    if by == "Type": return pd.DataFrame(d["by_type"][lo:hi] / 100, index=idx, columns=d["types"])
+    return pd.DataFrame({"Value": d["value"][lo:hi] / 100, "Flow": d["flow"][lo:hi] / 100}, index=idx)
+
+def value(files, dates=None):
+    # Portfolio value on each date (as of its last snapshot; 0 before the first). One date -> float
+    d = _get(files)
+    dates, one = _many(dates)
+    v = np.r_[0.0, d["value"]][_at(d, dates) + 1] / 100
+    return float(v[0]) if one else v
+
+def allocation(files, date=None):
+    # Value per Type and its share of the portfolio on a date (default: today)
+    d = _get(files)
+    i = _at(d, _many(date)[0])[0]
+    if i < 0: return pd.DataFrame({"Value": pd.Series(dtype="float64"), "Share": pd.Series(dtype="float64")})
+    v = pd.Series(d["by_type"][i] / 100, index=pd.Index(d["types"], name="Type"))
+    v = v[v != 0].sort_values(ascending=False)
+    return pd.DataFrame({"Value": v, "Share": v / v.sum() if v.sum() else 0.0})
+
+def twr(files, start=None, end=None):
+    # Time-weighted return from start to end (default: today); arrays of dates give an array.
+    # Each snapshot day's flow is taken out of its return, so contributions do not count as gains.
+    d = _get(files)
+    starts, one = _many(start) if start is not None else ([None], True)  # None: from the first snapshot
+    ends = _many(end)[0]
+    g = np.r_[1.0, d["growth"]]  # growth index, 1 before the first snapshot
+    r = g[_at(d, ends) + 1] / g[_at(d, starts) + 1] - 1
+    return float(r[0]) if one else r
+
+def performance(files, start=None, end=None):
+    # Snapshot days in (start, end]: Value, Flow and the cumulative time-weighted Return since start
+    d = _get(files)
+    h = history(files, start, end)
+    if start is not None: h = h[h.index > pd.Timestamp(start)]
+    g = np.r_[1.0, d["growth"]]
+    base = g[_at(d, [start])[0] + 1] if start is not None else 1.0
+    return h.assign(Return=g[_at(d, h.index) + 1] / base - 1)
+
+# ---------------------------
+# Nightly batch: daily snapshots for every user
+# ---------------------------
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Append daily valuation snapshots from the price file")
+    ap.add_argument("--from", dest="start", help="first day to value (default: the day after the latest snapshot, or today)")
+    ap.add_argument("--to", dest="end", help="last day to value (default: today)")
+    ap.add_argument("--users", nargs="*", help="user ids (default: every partition under data/users, plus the guest)")
+    args = ap.parse_args()
+    uids = args.users or storage.all_users()
+    end = pd.Timestamp(args.end or pd.Timestamp.today()).normalize()
+    for uid in uids:
+        files = storage.open_user(uid)
+        last = last_snapshot(files)
+        start = pd.Timestamp(args.start) if args.start else (last + pd.Timedelta(days=1) if last is not None else end)
+        n = snapshot(files, pd.date_range(start, end, freq="D"))
+        print(f"{uid}: {n} valuation rows")
@@ -0,0 +1,43 @@
+# smartscore.py — SmartScore engine (vectorized)
+#
+# score = 45% savings rate + 30% budget adherence + 25% goal progress, 0-100.
+# Every input may be a scalar or an array (one entry per user, per month, ...);
+# arrays are broadcast together and scored in one NumPy pass.
+import numpy as np
+import pandas as pd
+
+WEIGHTS = (0.45, 0.3, 0.25)  # savings rate, budget, goals
+NO_GOALS_SCORE = 0.5
+
+def goal_progress(goals_df):
+    targ = pd.to_numeric(goals_df["TargetAmount"], errors="coerce").fillna(0).to_numpy(dtype="float64")
+    saved = pd.to_numeric(goals_df["SavedSoFar"], errors="coerce").fillna(0).to_numpy(dtype="float64")
+    return np.where(targ <= 0, 1.0, np.minimum(1.0, saved / np.where(targ <= 0, 1.0, targ)))
+
+def goal_score(goals_df, by=None):
+    # Mean goal progress; with by=<column>, one score per group (e.g. per user)
+    if by is None:
+        return float(goal_progress(goals_df).mean()) if len(goals_df) > 0 else NO_GOALS_SCORE
+    if len(goals_df) == 0: return pd.Series(dtype="float64")
+    return pd.Series(goal_progress(goals_df), index=goals_df.index).groupby(goals_df[by]).mean()
+
+def smartscore_batch(income, expenses, investments, budget, goals=NO_GOALS_SCORE):
+    income, expenses, investments, budget, goals = np.broadcast_arrays(
+        *[np.asarray(x, dtype="float64") for x in (income, expenses, investments, budget, goals)])
+    safe_income = np.where(income > 0, income, 1.0)
+    savings_rate = np.where(income > 0, np.maximum(0.0, (income - expenses - investments) / safe_income), 0.0)
+    safe_budget = np.where(budget == 0, 1.0, budget)
+    budget_score = np.where(budget == 0, 1.0, np.maximum(0.0, 1 - np.maximum(0.0, expenses - budget) / safe_budget))
+    w_sav, w_bud, w_goal = WEIGHTS
+    raw = np.round((w_sav * savings_rate + w_bud * budget_score + w_goal * goals) * 100)
+    return np.clip(raw, 0, 100).astype("int64")
+
+def compute_smartscore(total_income, total_expenses, total_investments, budget, goals_df):
+    return int(smartscore_batch(total_income, total_expenses, total_investments, budget, goal_score(goals_df)))
+
+def monthly_smartscore(monthly_income, monthly_expenses, monthly_investments, budget, goals=NO_GOALS_SCORE):
+    # Inputs are per-month sums (Series indexed by "YYYY-MM"); returns one score per month
+    frame = pd.concat({"inc": monthly_income, "exp": monthly_expenses, "inv": monthly_investments}, axis=1)
+    frame = frame.sort_index().fillna(0.0)
+    scores = smartscore_batch(frame["inc"], frame["exp"], frame["inv"], budget, goals)
+    return pd.Series(scores, index=frame.index, name="SmartScore")
@@ -0,0 +1,173 @@
+# snapshot.py — typed columnar snapshots of the CSV ledgers (memory-mapped NumPy)
+#
+# A snapshot of "expenses.csv" lives in "expenses.csv.snap/":
+#   meta.json             generation, rows, CSV bytes covered, inode of the CSV, column kinds
+#   <col>.<gen>.npy       dates as int64 days since 1970 (NaT = int64 min),
+#                         numbers as float64, text as int32 dictionary codes (-1 = missing)
+#   <col>.<gen>.labels.json  dictionary for text columns
+# Column kinds come from the ledger schema (typed.py's column sets), never from
+# what pandas infers for the rows at hand, so an empty or all-blank column
+# keeps its kind. Ledgers are append-only, so rows written after the snapshot
+# are parsed from the CSV tail only. A rewrite of the CSV (new inode) makes the
+# snapshot stale. Builds run under the ledger's storage.write_lock (one at a
+# time, across processes) and write a new generation of files, then swap in
+# its meta.json with os.replace; reads take no lock: they check that the meta
+# they started from is still current when they are done, and retry otherwise.
+#
+# Usage: python snapshot.py expenses.csv incomes.csv ...
+import os, io, sys, json, uuid
+import numpy as np
+import pandas as pd
+import typed
+import storage  # (imports us too: only used at call time)
+
+# Rebuild once the unsnapshotted tail grows past this many bytes and this share of the file
+REBUILD_TAIL_BYTES = 1 << 20
+REBUILD_TAIL_RATIO = 0.25
+LOAD_RETRIES = 5  # lock-free attempts before a load waits for the write lock
+TEXT = {c: str for c in typed.LABEL_COLS}  # read_csv dtypes: text stays text, even when it looks numeric
+
+def snap_dir(path): return path + ".snap"
+def exists(path): return os.path.isdir(snap_dir(path))
+def _meta_path(path): return os.path.join(snap_dir(path), "meta.json")
+
+def invalidate(path):
+    # The CSV is about to be rewritten (caller holds the write lock): the next load rebuilds.
+    # The inode alone cannot tell, as a later rewrite may get the old inode number back.
+    try:
+        os.remove(_meta_path(path))
+    except FileNotFoundError:
+        pass
+
+def _read_meta(path):
+    try:
+        with open(_meta_path(path)) as f: return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# ---------------------------
+# Encode / decode columns
+# ---------------------------
+def _kind(name):
+    if name in typed.DATE_COLS: return "date"
+    if name in typed.LABEL_COLS: return "dict"
+    return "num"  # money, ids, tombstones, priorities
+
+def _encode(kind, s):
+    if kind == "date":
+        return pd.to_datetime(s, errors="coerce").to_numpy(dtype="datetime64[D]").view("int64"), None
+    if kind == "num":
+        return pd.to_numeric(s, errors="coerce").to_numpy(dtype="float64"), None
+    cat = pd.Categorical(s.where(s.isna(), s.astype(str)))
+    return cat.codes.astype("int32"), [str(c) for c in cat.categories]
+
+def _decode(kind, arr, labels):
+    if kind == "date": return pd.Series(arr.view("datetime64[D]").astype("datetime64[s]"))
+    if kind == "num": return pd.Series(arr)
+    return pd.Series(pd.Categorical.from_codes(arr, categories=labels))
+
+def _tail_series(kind, s, labels):
+    if kind == "date": return pd.to_datetime(s, errors="coerce").astype("datetime64[s]")
+    if kind == "num": return pd.to_numeric(s, errors="coerce").astype("float64")
+    return pd.Series(pd.Categorical(s.where(s.isna(), s.astype(str)), categories=labels))
+
+# ---------------------------
+# Build
+# ---------------------------
+def build(path):
+    with storage.write_lock(path):
+        d = snap_dir(path)
+        os.makedirs(d, exist_ok=True)
+        with open(path, "rb") as f:
+            raw = f.read()
+            ino = os.fstat(f.fileno()).st_ino
+        df = pd.read_csv(io.BytesIO(raw), dtype=TEXT)
+        gen = uuid.uuid4().hex[:12]
+        cols = []
+        for name in df.columns:
+            kind = _kind(name)
+            arr, labels = _encode(kind, df[name])
+            np.save(os.path.join(d, f"{name}.{gen}.npy"), arr)
+            if labels is not None:
+                with open(os.path.join(d, f"{name}.{gen}.labels.json"), "w") as f: json.dump(labels, f)
+            cols.append({"name": name, "kind": kind})
+        meta = {"gen": gen, "rows": len(df), "offset": len(raw), "inode": ino, "columns": cols}
+        with open(_meta_path(path) + ".tmp", "w") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(_meta_path(path) + ".tmp", _meta_path(path))  # the swap: readers now open this generation
+        for name in os.listdir(d):  # older generations; a reader still on one retries
+            if name != "meta.json" and f".{gen}." not in name: os.remove(os.path.join(d, name))
+
+# ---------------------------
+# Load (memory-mapped, lock-free) + CSV tail
+# ---------------------------
+def _stale(path, meta):
+    st_ = os.stat(path)
+    if meta is None or "gen" not in meta or meta["inode"] != st_.st_ino or st_.st_size < meta["offset"]:
+        return True  # no snapshot, an older layout, or the CSV was rewritten since
+    tail_bytes = st_.st_size - meta["offset"]
+    return tail_bytes > REBUILD_TAIL_BYTES and tail_bytes > REBUILD_TAIL_RATIO * meta["offset"]
+
+def _open(path, meta):
+    # Arrays + CSV tail of the generation `meta` names, or None if it was swapped out meanwhile
+    d, gen = snap_dir(path), meta["gen"]
+    data, labels = {}, {}
+    try:
+        for c in meta["columns"]:
+            name, kind = c["name"], c["kind"]
+            data[name] = (kind, np.load(os.path.join(d, f"{name}.{gen}.npy"), mmap_mode="r"))  # readable after removal
+            if kind == "dict":
+                with open(os.path.join(d, f"{name}.{gen}.labels.json")) as f: labels[name] = json.load(f)
+        with open(path, "rb") as f:
+            st_ = os.fstat(f.fileno())
+            if st_.st_ino != meta["inode"] or st_.st_size < meta["offset"]: return None
+            tail = _read_tail(f, meta["offset"])
+    except (FileNotFoundError, ValueError, EOFError):
+        return None
+    if _read_meta(path) != meta: return None  # rebuilt or invalidated while we read
+    return data, labels, tail
+
+def load(path):
+    got = None
+    for _ in range(LOAD_RETRIES):
+        meta = _read_meta(path)
+        if _stale(path, meta):
+            with storage.write_lock(path):  # one builder; the others wait, then find it fresh
+                if _stale(path, _read_meta(path)): build(path)
+            continue
+        got = _open(path, meta)
+        if got is not None: break
+    if got is None:
+        with storage.write_lock(path):  # kept racing rebuilds: read with them held off
+            if _stale(path, _read_meta(path)): build(path)
+            got = _open(path, _read_meta(path))
+    data, labels, tail = got
+
+    if tail is not None and not tail.empty:
+        for name, (kind, _) in data.items():
+            if kind == "dict" and name in tail.columns:
+                known = set(labels[name])
+                labels[name] = labels[name] + [x for x in pd.unique(tail[name].dropna().astype(str)) if x not in known]
+
+    df = pd.DataFrame({name: _decode(kind, arr, labels.get(name)) for name, (kind, arr) in data.items()})
+    if tail is not None and not tail.empty:
+        tail = pd.DataFrame({name: _tail_series(kind, tail[name], labels.get(name)) if name in tail.columns
+                             else pd.Series([None] * len(tail)) for name, (kind, _) in data.items()})
+        df = pd.concat([df, tail], ignore_index=True)
+    return df
+
+def _read_tail(f, offset):
+    # Rows past the snapshot, from the open CSV file
+    f.seek(0)
+    header = f.readline()
+    f.seek(offset)
+    rest = f.read()
+    if not rest.strip(): return None
+    return pd.read_csv(io.BytesIO(header + rest), dtype=TEXT)
+
+if __name__ == "__main__":
+    for p in sys.argv[1:]:
+        build(p)
+        print(f"{p}: snapshot written to {snap_dir(p)}")
@@ -0,0 +1,219 @@
+# sqlite_store.py — SQLite backend for the ledgers (enable with SMARTSPEND_BACKEND=sqlite)
+#
+# All users share one database; every ledger is a table with a `user` column
+# (the partition key from storage.owner) and indexes on (user, Date) and
+# (user, <group column>). The row id is the record Id of the id'd ledgers, so
+# deletes and edits hit it directly. storage.py keeps its path-based API and
+# forwards here, so pages do not care which backend is active. Connections run
+# in WAL mode and are pooled for the whole process (all Streamlit sessions).
+import os, sqlite3, threading, queue
+from contextlib import contextmanager
+import pandas as pd
+import storage
+
+DB_FILE = os.environ.get("SMARTSPEND_DB", os.path.join("data", "smartspend.db"))
+POOL_SIZE = 8
+
+TABLES = {"expenses.csv": "expenses", "incomes.csv": "incomes", "investments.csv": "investments", "goals.csv": "goals",
+          "valuations.csv": "valuations"}
+NUM_COLS = {"Amount", "CurrentValue", "TargetAmount", "SavedSoFar", "Priority", "Holding", "Value", "Flow"}
+# Second index per table, next to (user, Date)
+INDEX_COLS = {"expenses": "Category", "incomes": "Source", "investments": "Type", "valuations": "Holding"}
+
+# ---------------------------
+# Connection pool
+# ---------------------------
+_pool = queue.LifoQueue()
+_init_lock = threading.Lock()
+_initialized = False
+
+def _columns(name):
+    # Stored columns: the record Id is the row id, and deletes are real deletes (no tombstones)
+    return [col for col in storage.COLUMNS[name] if col not in (storage.ID_COL, storage.DELETED_COL)]
+
+def _schema(c):
+    for name, table in TABLES.items():
+        cols = _columns(name)
+        defs = ", ".join(f'"{col}" {"REAL" if col in NUM_COLS else "TEXT"}' for col in cols)
+        key = storage.KEYS.get(name)
+        unique = f', UNIQUE(user, "{key}")' if key else ""
+        c.execute(f'CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, user TEXT NOT NULL, {defs}{unique})')
+        have = {r[1] for r in c.execute(f"PRAGMA table_info({table})")}
+        for col in cols:  # columns added since the table was created start empty
+            if col not in have: c.execute(f'ALTER TABLE {table} ADD COLUMN "{col}" {"REAL" if col in NUM_COLS else "TEXT"}')
+        if "Date" in cols:
+            c.execute(f'CREATE INDEX IF NOT EXISTS {table}_user_date ON {table}(user, Date)')
+        if table in INDEX_COLS:
+            col = INDEX_COLS[table]
+            c.execute(f'CREATE INDEX IF NOT EXISTS {table}_user_{col.lower()} ON {table}(user, "{col}")')
+    # Per-ledger write counter, bumped in the same transaction as every write (cache stamp)
+    c.execute("CREATE TABLE IF NOT EXISTS versions (user TEXT, ledger TEXT, version INTEGER, PRIMARY KEY(user, ledger))")
+    # Largest row id ever deleted per table, so new rows never reuse the id of a deleted one
+    c.execute("CREATE TABLE IF NOT EXISTS high_water (ledger TEXT PRIMARY KEY, id INTEGER)")
+
+def _connect():
+    global _initialized
+    os.makedirs(os.path.dirname(os.path.abspath(DB_FILE)), exist_ok=True)
+    c = sqlite3.connect(DB_FILE, timeout=30, check_same_thread=False)
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    with _init_lock:
+        if not _initialized:
+            with c: _schema(c)
+            _initialized = True
+    return c
+
+@contextmanager
+def connection():
+    try:
+        c = _pool.get_nowait()
+    except queue.Empty:
+        c = _connect()
+    try:
+        yield c
+    finally:
+        if _pool.qsize() < POOL_SIZE: _pool.put(c)
+        else: c.close()
+
+# ---------------------------
+# Helpers
+# ---------------------------
+def _target(path):
+    name = os.path.basename(path)
+    return storage.owner(path), TABLES[name], _columns(name), storage.KEYS.get(name)
+
+def _bump(c, user, table):
+    c.execute("INSERT INTO versions VALUES (?, ?, 1) ON CONFLICT(user, ledger) DO UPDATE SET version = version + 1",
+              (user, table))
+
+def _insert(c, user, table, cols, key, records, first=None):
+    # first: id of the first new row (the rest follow), else SQLite picks them
+    names = ", ".join(f'"{col}"' for col in cols)
+    marks = ", ".join("?" * (len(cols) + 1))
+    sql = f"INSERT INTO {table} (user, {names}) VALUES ({marks})"
+    if first is not None:
+        sql = f"INSERT INTO {table} (id, user, {names}) VALUES (?, {marks})"
+        records = [dict(r, **{storage.ID_COL: i}) for i, r in enumerate(records, first)]
+    if key:  # keyed ledgers (goals) update in place
+        sets = ", ".join(f'"{col}" = excluded."{col}"' for col in cols if col != key)
+        sql += f' ON CONFLICT(user, "{key}") DO UPDATE SET {sets}'
+    fmt = storage._format
+    c.executemany(sql, (([r[storage.ID_COL]] if first is not None else []) + [user]
+                        + [fmt(r.get(col)) if col not in NUM_COLS else _num(r.get(col)) for col in cols]
+                        for r in records))
+
+def _num(x):
+    try:
+        x = float(x)
+    except (TypeError, ValueError):
+        return None
+    return None if x != x else x
+
+# ---------------------------
+# Ledger operations (mirroring storage.py)
+# ---------------------------
+def ensure(path):
+    # First use of a ledger: import the user's CSV file if there is one
+    user, table, cols, key = _target(path)
+    with connection() as c, c:
+        if c.execute("SELECT 1 FROM versions WHERE user = ? AND ledger = ?", (user, table)).fetchone(): return
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            df = storage._live_rows(path, pd.read_csv(path))
+            _insert(c, user, table, cols, key, df.to_dict("records"))
+        _bump(c, user, table)
+
+def append(path, records):
+    # Returns the new rows' ids (None for keyed ledgers, whose rows may be upserts)
+    user, table, cols, key = _target(path)
+    if isinstance(records, pd.DataFrame): records = records.to_dict("records")
+    with connection() as c, c:
+        c.execute("BEGIN IMMEDIATE")  # hold the write lock, so new ids follow MAX(id)
+        first = c.execute(f"SELECT MAX(COALESCE(MAX(id), 0), COALESCE((SELECT id FROM high_water WHERE ledger = ?), 0))"
+                          f" + 1 FROM {table}", (table,)).fetchone()[0]
+        _insert(c, user, table, cols, key, records, None if key else first)
+        _bump(c, user, table)
+    return None if key else list(range(first, first + len(records)))
+
+def update(path, records):
+    # records carry their row id in "Id"
+    user, table, cols, _ = _target(path)
+    sets = ", ".join(f'"{col}" = ?' for col in cols)
+    fmt = storage._format
+    with connection() as c, c:
+        c.executemany(f"UPDATE {table} SET {sets} WHERE user = ? AND id = ?",
+                      ([fmt(r.get(col)) if col not in NUM_COLS else _num(r.get(col)) for col in cols]
+                       + [user, int(r[storage.ID_COL])] for r in records))
+        _bump(c, user, table)
+
+def replace(path, df):
+    user, table, cols, key = _target(path)
+    with connection() as c, c:
+        c.execute(f"DELETE FROM {table} WHERE user = ?", (user,))
+        _insert(c, user, table, cols, key, df.to_dict("records"))
+        _bump(c, user, table)
+
+def delete(path, ids):
+    user, table, _, _ = _target(path)
+    with connection() as c, c:
+        c.execute(f"INSERT INTO high_water SELECT ?, MAX(id) FROM {table} WHERE true"
+                  " ON CONFLICT(ledger) DO UPDATE SET id = MAX(id, excluded.id)", (table,))
+        c.executemany(f"DELETE FROM {table} WHERE user = ? AND id = ?", [(user, int(i)) for i in ids])
+        _bump(c, user, table)
+
+def version(path):
+    user, table, _, _ = _target(path)
+    with connection() as c:
+        row = c.execute("SELECT version FROM versions WHERE user = ? AND ledger = ?", (user, table)).fetchone()
+    return row[0] if row else 0
+
+def _select(table, cols, key):
+    # Id'd ledgers expose the row id as their "Id" column
+    names = ", ".join(f'"{col}"' for col in cols)
+    return f'SELECT id AS "{storage.ID_COL}", {names}' if not key else f"SELECT {names}"
+
+def load(path):
+    user, table, cols, key = _target(path)
+    with connection() as c:
+        return pd.read_sql_query(f"{_select(table, cols, key)} FROM {table} WHERE user = ? ORDER BY id", c,
+                                 params=(user,))
+
+# ---------------------------
+# Push-down queries (served by the (user, Date) / (user, group) indexes)
+# ---------------------------
+def recent(path, k, offset=0):
+    user, table, cols, key = _target(path)
+    with connection() as c:
+        return pd.read_sql_query(f"{_select(table, cols, key)} FROM {table} WHERE user = ? AND Date IS NOT NULL "
+                                 f"AND Date != '' ORDER BY Date DESC, id DESC LIMIT ? OFFSET ?", c,
+                                 params=(user, int(k), int(offset)))
+
+def buckets(path, group_col):
+    # (Month, Group) sums for aggregates.py, grouped inside SQLite (as integer cents, so they are exact)
+    user, table, cols, _ = _target(path)
+    value = "COALESCE(CurrentValue, 0)" if "CurrentValue" in cols else "0"
+    sql = (f"SELECT CASE WHEN Date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]*' THEN substr(Date, 1, 7) ELSE '' END AS Month, "
+           f'COALESCE("{group_col}", \'\') AS "Group", COALESCE(SUM(CAST(ROUND(Amount * 100) AS INTEGER)), 0) / 100.0 AS Amount, '
+           f'SUM(CAST(ROUND({value} * 100) AS INTEGER)) / 100.0 AS Value, '
+           f"COUNT(*) AS Count FROM {table} WHERE user = ? GROUP BY Month, \"Group\"")
+    with connection() as c:
+        return pd.read_sql_query(sql, c, params=(user,))
+
+def page(path, sort, descending, date_from, date_to, where, offset, limit):
+    # Filtered, sorted window + match count; Date filters/sorts use the (user, Date) index
+    user, table, cols, key = _target(path)
+    if sort not in cols: raise ValueError(f"cannot sort {table} by {sort!r}")
+    conds, params = ["user = ?"], [user]
+    if date_from is not None: conds.append("Date >= ?"); params.append(storage._format(pd.Timestamp(date_from)))
+    if date_to is not None: conds.append("Date <= ?"); params.append(storage._format(pd.Timestamp(date_to)))
+    for col, values in (where or {}).items():
+        if col not in cols: raise ValueError(f"cannot filter {table} by {col!r}")
+        values = list(values)
+        conds.append(f'"{col}" IN ({", ".join("?" * len(values))})'); params += values
+    cond = " AND ".join(conds)
+    direction = "DESC" if descending else "ASC"
+    with connection() as c:
+        total = c.execute(f"SELECT COUNT(*) FROM {table} WHERE {cond}", params).fetchone()[0]
+        rows = pd.read_sql_query(f'{_select(table, cols, key)} FROM {table} WHERE {cond} '
+                                 f'ORDER BY "{sort}" IS NULL, "{sort}" {direction}, id {direction} LIMIT ? OFFSET ?',
+                                 c, params=params + [int(limit), int(offset)])
+    return rows, total
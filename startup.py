@@ -0,0 +1,44 @@
+# startup.py — import-time budget for the Streamlit entry point
+#
+# Each stage's imports are timed in a fresh interpreter, after streamlit itself
+# is loaded (the server has it imported before the first script run), so the
+# numbers are what a cold start adds on top of Streamlit.
+#
+# Usage: python startup.py [--runs N]   (exit status 1 if a stage is over budget)
+import sys, argparse, subprocess
+
+# stage -> (modules imported by app.py / pages/ on the way to that page, budget in ms)
+STAGES = {
+    "landing": (["common", "metrics"], 50),
+    "data pages": (["pandas", "storage", "aggregates", "activity", "smartscore", "portfolio"], 600),
+    "dashboard charts": (["graphs", "trends", "forecast", "budgets"], 200),
+    "add expense (auto category)": (["categorizer", "sklearn.feature_extraction.text", "sklearn.linear_model"], 1500),
+    "import": (["importer"], 100),
+}
+
+_PROBE = """
+import time, importlib, streamlit
+t = time.perf_counter()
+for m in {mods!r}: importlib.import_module(m)
+print((time.perf_counter() - t) * 1000)
+"""
+
+def measure(stage, runs=3):
+    # Best of `runs` cold imports (ms); earlier stages are preloaded, as they are in the app
+    names = list(STAGES)
+    pre = [m for s in names[:names.index(stage)] if s != "landing" for m in STAGES[s][0]]
+    code = "import importlib\nfor m in %r: importlib.import_module(m)\n" % pre + _PROBE.format(mods=STAGES[stage][0])
+    times = [float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout)
+             for _ in range(runs)]
+    return min(times)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Check SmartSpend cold-start import times against their budgets")
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+    over = False
+    for stage, (mods, budget) in STAGES.items():
+        ms = measure(stage, args.runs)
+        over |= ms > budget
+        print(f"{stage:<30} {ms:8.1f} ms  (budget {budget} ms){'  OVER' if ms > budget else ''}")
+    sys.exit(1 if over else 0)
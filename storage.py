@@ -0,0 +1,716 @@
+# storage.py — SmartSpend ledger storage (append-only CSV, or SQLite via sqlite_store.py)
+import os, re, csv, io, hashlib, threading, atexit, time, random
+from collections import OrderedDict
+from contextlib import contextmanager, ExitStack
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+import snapshot
+import metrics
+import typed
+try:
+    import fcntl  # cross-process file locks (POSIX); elsewhere writers only lock within the process
+except ImportError:
+    fcntl = None
+
+# ---------------------------
+# File paths (persistent storage)
+# ---------------------------
+EXP_FILE = "expenses.csv"
+INC_FILE = "incomes.csv"
+INV_FILE = "investments.csv"
+GOAL_FILE = "goals.csv"
+VAL_FILE = "valuations.csv"
+
+SET_FILE = "settings.json"
+
+# "csv" (default) or "sqlite"; the API below is the same for both
+BACKEND = os.environ.get("SMARTSPEND_BACKEND", "csv")
+
+# Per-user partitions: data/users/<user id>/ holds that user's ledgers + settings.
+# The guest session (not logged in) uses the top-level demo files.
+USERS_DIR = os.path.join("data", "users")
+GUEST = "~guest"  # cannot collide with a sanitized user id
+
+# Column layout for each ledger (keyed by file name)
+COLUMNS = {
+    "expenses.csv": ["Id","Date","Category","Note","Amount","Deleted"],
+    "incomes.csv": ["Id","Date","Source","Amount","Deleted"],
+    "investments.csv": ["Id","Date","Type","Amount","CurrentValue","Deleted"],
+    "goals.csv": ["Name","TargetAmount","SavedSoFar","TargetDate","Priority"],
+    "valuations.csv": ["Date","Holding","Type","Value","Flow"],
+}
+# Ledgers updated by appending a new version of a row: the last row per key wins
+KEYS = {"goals.csv": "Name"}
+# Ledgers whose rows carry a stable record id. An edit appends a new version of
+# the row (same Id) and a delete appends a tombstone (Id + Deleted=1); reads keep
+# the last version per Id, drop tombstones and keep rows in Id (insertion) order.
+ID_COL = "Id"
+DELETED_COL = "Deleted"
+ID_LEDGERS = {"expenses.csv", "incomes.csv", "investments.csv"}
+
+# Optimistic attempts of a transaction before it runs fn under the locks
+TXN_RETRIES = 3
+# Compact a keyed ledger once superseded rows outnumber live ones by this factor
+COMPACT_RATIO = 2
+# Parsed ledgers kept in memory for all sessions (LRU, bounded by frame size)
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+DATE_COLS = ["Date", "TargetDate"]
+
+def columns_for(path): return COLUMNS[os.path.basename(path)]
+def key_for(path): return KEYS.get(os.path.basename(path))
+def has_ids(path): return os.path.basename(path) in ID_LEDGERS
+def data_columns(path): return [c for c in columns_for(path) if c not in (ID_COL, DELETED_COL)]
+
+def _sql():
+    import sqlite_store  # only loaded when the SQLite backend is active
+    return sqlite_store
+
+# ---------------------------
+# Low-level file helpers
+# ---------------------------
+def _fsync_dir(path):
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try: os.fsync(fd)
+    except OSError: pass
+    finally: os.close(fd)
+
+def _header(path):
+    with open(path, "r", newline="") as f:
+        line = f.readline()
+    return next(csv.reader([line]), []) if line.strip() else []
+
+def _format(value):
+    if value is None or value is pd.NaT or (isinstance(value, float) and value != value): return ""
+    if isinstance(value, pd.Timestamp): return "" if pd.isna(value) else value.strftime("%Y-%m-%d")
+    if isinstance(value, datetime): return value.strftime("%Y-%m-%d")
+    if isinstance(value, date): return value.isoformat()
+    return value
+
+def _lines(cols, records):
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    for r in records:
+        w.writerow([_format(r.get(c)) for c in cols])
+    return buf.getvalue()
+
+# ---------------------------
+# Recovery: undo a torn append or an interrupted compaction
+# ---------------------------
+def recover(path):
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)  # compaction died before the rename; the original is intact
+    if not os.path.exists(path): return
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0: return
+        f.seek(end - 1)
+        if f.read(1) == b"\n": return
+        # Last line has no newline -> partial write; cut back to the previous newline
+        pos = end
+        while pos > 0:
+            step = min(4096, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            nl = chunk.rfind(b"\n")
+            if nl != -1:
+                pos = pos - step + nl + 1
+                break
+            pos -= step
+        f.truncate(pos)
+        f.flush(); os.fsync(f.fileno())
+
+# ---------------------------
+# Change hooks + per-ledger write locks
+# ---------------------------
+_hooks = []
+_path_locks = {}
+_locks_guard = threading.Lock()
+
+def on_change(fn):
+    # fn(event, path, records, before) runs after each write, under the ledger's lock.
+    # event is "append" / "delete" (records = affected rows: a list of dicts
+    # or, for bulk appends, a DataFrame) or "rewrite"; before is the ledger's
+    # stamp right before the write, so a hook can tell whether state it derived
+    # earlier is still the base this write applies to.
+    _hooks.append(fn)
+
+def _notify(event, path, records=(), before=None):
+    for fn in _hooks: fn(event, path, records, before)
+
+def path_lock(path):
+    with _locks_guard:
+        return _path_locks.setdefault(os.path.abspath(path), threading.RLock())
+
+_file_locks = {}  # abs path -> [open <ledger>.lock file, nesting depth]; only touched under the path lock
+
+@contextmanager
+def write_lock(path):
+    # Exclusive write access: the in-process path lock plus, for CSV ledgers, an
+    # flock on <ledger>.lock so writers in other server processes queue up too.
+    # Re-entrant like path_lock (an update reads, which may flush queued rows).
+    key = os.path.abspath(path)
+    with path_lock(key):
+        if BACKEND == "sqlite" or fcntl is None:
+            yield
+            return
+        held = _file_locks.get(key)
+        if held: held[1] += 1
+        else:
+            f = open(key + ".lock", "a+")
+            fcntl.flock(f, fcntl.LOCK_EX)
+            held = _file_locks[key] = [f, 1]
+        try: yield
+        finally:
+            held[1] -= 1
+            if held[1] == 0:
+                del _file_locks[key]
+                fcntl.flock(held[0], fcntl.LOCK_UN)
+                held[0].close()
+
+def ensure_ledger(path):
+    if BACKEND == "sqlite":
+        _sql().ensure(path)
+        return
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        with write_lock(path): _replace(path, pd.DataFrame(columns=columns_for(path)))
+    else:
+        recover(path)
+        header = _header(path)
+        if has_ids(path) and ID_COL not in header: _add_ids(path)
+        elif set(columns_for(path)) - set(header): _add_columns(path)
+
+def _add_ids(path):
+    # One-time upgrade of a ledger written before record ids: number the rows 1..n
+    with write_lock(path):
+        before = stamp(path)
+        df = pd.read_csv(path)
+        df.insert(0, ID_COL, np.arange(1, len(df) + 1, dtype="int64"))
+        df[DELETED_COL] = pd.Series(dtype="float64")
+        _replace(path, df.reindex(columns=columns_for(path)))
+        _notify("rewrite", path, before=before)
+
+def _add_columns(path):
+    # One-time upgrade of a ledger written before a column was added: the new columns start empty
+    with write_lock(path):
+        before = stamp(path)
+        _replace(path, pd.read_csv(path).reindex(columns=columns_for(path)))
+        _notify("rewrite", path, before=before)
+
+# ---------------------------
+# Writes
+# ---------------------------
+def _write(path, records):
+    # Append rows as they are (ids included) with one write + fsync; caller holds the write lock
+    cols = _header(path) or columns_for(path)
+    with metrics.timer("csv.append") as m:
+        if isinstance(records, pd.DataFrame):
+            data = records.reindex(columns=cols).to_csv(header=False, index=False, lineterminator="\n").encode("utf-8")
+        else:
+            data = _lines(cols, records).encode("utf-8")
+        with open(path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        m["bytes"], m["rows"] = len(data), len(records)
+    return stamp(path)
+
+def append_records(path, records):
+    # records: list of dicts, or a DataFrame for bulk appends (one write, one fsync).
+    # New rows of an id'd ledger get fresh ids, returned in order (None otherwise).
+    if not isinstance(records, pd.DataFrame): records = list(records)
+    if len(records) == 0: return
+    with write_lock(path):
+        ids = None
+        if BACKEND == "sqlite":
+            before = stamp(path)
+            ids = _sql().append(path, records)
+        else:
+            if has_ids(path):
+                start = _alloc_ids(path)
+                ids = list(range(start, start + len(records)))
+                if isinstance(records, pd.DataFrame): records = records.assign(**{ID_COL: ids})
+                else: records = [dict(r, **{ID_COL: i}) for r, i in zip(records, ids)]
+            before = stamp(path)  # after id allocation, which may flush queued rows
+            after = _write(path, records)
+            if ids: _next_ids[os.path.abspath(path)] = (after, ids[-1] + 1)
+        invalidate(path)
+        _notify("append", path, records, before)
+    return ids
+
+def append_record(path, record):
+    ids = append_records(path, [record])
+    return ids[0] if ids else None
+
+def _live(path, ids):
+    # Current version of each given record (skipping unknown ids), as dicts
+    df = read_typed(path)
+    return typed.decode(df[df[ID_COL].isin(list(ids))]).to_dict("records")
+
+def delete_records(path, ids):
+    # Delete rows by record id: one tombstone line each (O(k) I/O), all in one write
+    with write_lock(path):
+        removed = _live(path, ids)
+        if not removed: return 0
+        before = stamp(path)
+        if BACKEND == "sqlite":
+            _sql().delete(path, [r[ID_COL] for r in removed])
+        else:
+            _write(path, [{ID_COL: r[ID_COL], DELETED_COL: 1} for r in removed])
+        invalidate(path)
+        _notify("delete", path, removed, before)
+    return len(removed)
+
+def update_records(path, records):
+    # Edit rows in place by record id (each record: Id + the new values), all in one write
+    by_id = {int(r[ID_COL]): r for r in records}
+    with write_lock(path):
+        old = _live(path, by_id)
+        if not old: return 0
+        new = [dict(r, **{c: by_id[int(r[ID_COL])][c] for c in data_columns(path) if c in by_id[int(r[ID_COL])]})
+               for r in old]
+        before = stamp(path)
+        if BACKEND == "sqlite":
+            _sql().update(path, new)
+        else:
+            _write(path, new)
+        invalidate(path)
+        _notify("delete", path, old, before)  # hooks see an edit as old version out, new version in
+        _notify("append", path, new, stamp(path))
+    return len(new)
+
+def _replace(path, df):
+    if BACKEND == "sqlite":
+        _sql().replace(path, df)
+        invalidate(path)
+        return
+    tmp = path + ".tmp"
+    with metrics.timer("csv.rewrite") as m:
+        with open(tmp, "w", newline="") as f:
+            df.to_csv(f, index=False, lineterminator="\n")
+            f.flush()
+            os.fsync(f.fileno())
+        m["bytes"], m["rows"] = os.path.getsize(tmp), len(df)
+    snapshot.invalidate(path)
+    os.replace(tmp, path)
+    _fsync_dir(path)
+    invalidate(path)
+
+# ---------------------------
+# Transactions: atomic read-modify-write
+# ---------------------------
+def version(path):
+    # Changes on every write to the ledger, in this process or another
+    key = os.path.abspath(path)
+    return (stamp(key), _versions.get(key, 0))
+
+def transact(path, fn, watch=(), retries=TXN_RETRIES):
+    # fn(df) gets the ledger's live rows and returns the records to append (a new
+    # version of a keyed row, say), or nothing to write nothing; it may raise to abort.
+    # fn runs on a snapshot, without locks; its records are appended under the write
+    # lock only if neither the ledger nor any `watch`ed ledger it read has changed
+    # since, otherwise it is re-run on fresh data. The final attempt holds the locks
+    # throughout, so a busy ledger cannot starve it. Returns the new ids, if any.
+    paths = sorted({os.path.abspath(p) for p in (path, *watch)})  # one lock order for every caller
+    for attempt in range(retries + 1):
+        if attempt: time.sleep(random.uniform(0, 0.01 * attempt))  # spread out retrying writers
+        with ExitStack() as stack:
+            if attempt == retries:
+                for p in paths: stack.enter_context(write_lock(p))
+            for p in paths: _drain(p)
+            seen = [version(p) for p in paths]
+            records = fn(read_ledger(path))
+            if records is None or len(records) == 0: return None
+            if attempt < retries:
+                for p in paths: stack.enter_context(write_lock(p))
+                if [version(p) for p in paths] != seen: continue  # lost the race: retry on fresh data
+            return append_records(path, records)
+
+# ---------------------------
+# Write queue: rapid submissions share one append (group commit)
+# ---------------------------
+FLUSH_INTERVAL = 0.05  # seconds a queued row may wait for company
+FLUSH_ROWS = 500       # ... unless a ledger has this many queued
+SUBMIT_TIMEOUT = 30.0  # seconds submit(wait=True) waits for its row before giving up
+_pending = {}          # abs path -> [(record, ticket), ...] in submission order
+_flushing = set()      # ledgers whose queued rows are being appended (changed under _queue)
+_queue = threading.Condition()
+_flusher = None
+
+def submit(path, record, wait=True, timeout=SUBMIT_TIMEOUT):
+    # Queue one row; a background flusher appends everything queued within
+    # FLUSH_INTERVAL in one write + fsync per ledger. wait=True blocks until the
+    # row is on disk and returns its id. Reads of the ledger flush it first, so
+    # the submitting session always sees its own rows.
+    global _flusher
+    key = os.path.abspath(path)
+    ticket = {"done": threading.Event(), "id": None, "error": None}
+    with _queue:
+        _pending.setdefault(key, []).append((record, ticket))
+        if _flusher is None or not _flusher.is_alive():  # first use, or the last one died
+            _flusher = threading.Thread(target=_flush_loop, name="ledger flusher", daemon=True)
+            _flusher.start()
+        _queue.notify_all()
+    if not wait: return None
+    if not ticket["done"].wait(timeout):
+        with _queue:
+            queued = _pending.get(key, [])
+            if key not in _flushing and any(t is ticket for _, t in queued):
+                queued[:] = [(r, t) for r, t in queued if t is not ticket]  # withdrawn: it will not be written
+                if not queued: del _pending[key]
+                raise TimeoutError(f"{os.path.basename(key)}: row not written within {timeout} s (withdrawn)")
+        if not ticket["done"].is_set():
+            raise TimeoutError(f"{os.path.basename(key)}: row still being written after {timeout} s")
+    if ticket["error"] is not None: raise ticket["error"]
+    return ticket["id"]
+
+def _flush_loop():
+    while True:
+        with _queue:
+            while not _pending: _queue.wait()
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while _pending and max(map(len, _pending.values())) < FLUSH_ROWS:
+                left = deadline - time.monotonic()
+                if left <= 0: break
+                _queue.wait(left)
+        flush()
+
+def flush(path=None):
+    # Write out queued rows (of one ledger, or all); returns once they are on disk.
+    # Whatever goes wrong with a ledger (its lock file, its append) fails that
+    # ledger's tickets with the error and moves on to the next one.
+    keys = [os.path.abspath(path)] if path is not None else list(_pending)
+    for key in keys:
+        batch = ids = error = None
+        try:
+            with write_lock(key):
+                with _queue:
+                    if key in _flushing: continue  # re-entered from our own append (id allocation reads)
+                    batch = list(_pending.get(key, ()))
+                    if not batch: continue
+                    _flushing.add(key)
+                try:
+                    ids, error = append_records(key, [r for r, _ in batch]) or [None] * len(batch), None
+                except Exception as e:
+                    ids, error = [None] * len(batch), e
+                finally:
+                    with _queue:  # rows queued meanwhile stay for the next flush
+                        _flushing.discard(key)
+                        rest = _pending.get(key, [])[len(batch):]
+                        if rest: _pending[key] = rest
+                        else: _pending.pop(key, None)
+        except Exception as e:
+            if batch is None:  # could not lock the ledger: fail everything queued for it
+                with _queue: batch = _pending.pop(key, []) if key not in _flushing else []
+            if ids is None: ids, error = [None] * len(batch), e  # (rows already appended keep their ids)
+        for (_, ticket), i in zip(batch, ids):
+            ticket["id"], ticket["error"] = i, error
+            ticket["done"].set()
+
+def _drain(path):
+    # Read-your-writes: rows still queued for this ledger are written before it is read
+    if _pending and os.path.abspath(path) in _pending: flush(path)
+
+atexit.register(flush)
+
+# ---------------------------
+# Reads
+# ---------------------------
+def _dedupe(df, key):
+    return df.drop_duplicates(subset=key, keep="last").reset_index(drop=True)
+
+def _resolve(df):
+    # Id'd ledger -> live rows: last version per Id, no tombstones, in Id order
+    ids = df[ID_COL].to_numpy(dtype="int64")
+    dead = df[DELETED_COL].notna().to_numpy() if DELETED_COL in df.columns else None
+    if (len(ids) > 1 and not (np.diff(ids) > 0).all()) or (dead is not None and dead.any()):
+        df = df.drop_duplicates(subset=ID_COL, keep="last")
+        df = df[df[DELETED_COL].isna()] if DELETED_COL in df.columns else df
+        df = df.sort_values(ID_COL, kind="stable")
+    return df.drop(columns=[DELETED_COL], errors="ignore").astype({ID_COL: "int64"}).reset_index(drop=True)
+
+def _live_rows(path, df):
+    if has_ids(path) and ID_COL in df.columns:
+        _max_ids[os.path.abspath(path)] = int(df[ID_COL].max()) if len(df) else 0
+        return _resolve(df)
+    key = key_for(path)
+    if key and key in df.columns and not df.empty: return _dedupe(df, key)
+    return df
+
+def load_ledger(path):
+    if BACKEND == "sqlite":
+        with metrics.timer("sqlite.load") as m:
+            df = _sql().load(path)
+            m["rows"] = len(df)
+        return df
+    # Ledgers with a columnar snapshot (see snapshot.py) skip CSV parsing
+    with metrics.timer("snapshot.load" if snapshot.exists(path) else "csv.read") as m:
+        df = snapshot.load(path) if snapshot.exists(path) else pd.read_csv(path)
+        m["rows"] = len(df)
+        if metrics.ENABLED: m["bytes"] = os.path.getsize(path)
+    live = _live_rows(path, df)
+    if len(live) < len(df) and len(df) >= COMPACT_RATIO * len(live) + 8:
+        compact_async(path)  # same live rows, so no change event
+    return live
+
+def compact(path):
+    # Rewrite with live rows only (superseded versions and tombstones dropped)
+    if BACKEND == "sqlite": return  # rows are updated in place, nothing to compact
+    with write_lock(path):
+        with metrics.timer("csv.read") as m:
+            raw = pd.read_csv(path)
+            m["rows"], m["bytes"] = len(raw), os.path.getsize(path)
+        df = _live_rows(path, raw)
+        if has_ids(path):
+            top = _max_ids.get(os.path.abspath(path), 0)
+            if len(df) == 0 or top > df[ID_COL].max(): _save_high_water(path, top)  # its tombstone goes
+            df = df.reindex(columns=columns_for(path))
+        _replace(path, df)
+
+_compacting = set()
+
+def compact_async(path):
+    # Compaction in a background thread, off the reader's path; at most one per ledger
+    key = os.path.abspath(path)
+    with _locks_guard:
+        if key in _compacting: return
+        _compacting.add(key)
+    def run():
+        try: compact(key)
+        finally:
+            with _locks_guard: _compacting.discard(key)
+    threading.Thread(target=run, name=f"compact {os.path.basename(key)}", daemon=True).start()
+
+# ---------------------------
+# Record ids
+# ---------------------------
+_max_ids = {}   # abs path -> largest Id in the file (tombstones included), set on load
+_next_ids = {}  # abs path -> (stamp after our last append, next free id)
+
+# Ids are never reused, even after compaction drops the tombstone of the largest
+# one: compact() first saves that id to <ledger>.ids (the high-water mark)
+def _high_water(path):
+    try:
+        with open(path + ".ids") as f: return int(f.read())
+    except (FileNotFoundError, ValueError):
+        return 0
+
+def _save_high_water(path, top):
+    if top <= _high_water(path): return
+    tmp = path + ".ids.tmp"
+    with open(tmp, "w") as f:
+        f.write(str(top))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path + ".ids")
+    _fsync_dir(path)
+
+def _alloc_ids(path):
+    # First free id; caller holds the write lock. Re-derived from the file when another writer touched it.
+    key = os.path.abspath(path)
+    hit = _next_ids.get(key)
+    if hit and hit[0] == stamp(key): return hit[1]
+    read_typed(key)  # (re)loads the file if needed, which records its largest id
+    return max(_max_ids.get(key, 0), _high_water(key), hit[1] - 1 if hit else 0) + 1
+
+# ---------------------------
+# Process-wide ledger cache (shared by every session on this server)
+# ---------------------------
+_cache = OrderedDict()  # abs path -> (stamp, nbytes, typed frame)
+_cache_bytes = 0
+_orders = {}            # abs path -> (stamp, row positions newest-first, rows with a date); part of the cache entry
+_sorts = {}             # abs path -> {(column, descending): (stamp, row positions), "filtered": last page() filter}; part of the cache entry
+_versions = {}          # abs path -> write counter, bumped by invalidate()
+_cache_lock = threading.Lock()
+
+def stamp(path):
+    # Changes whenever the ledger's content may have changed (also by other processes)
+    if BACKEND == "sqlite": return _sql().version(path)
+    st_ = os.stat(path)
+    return (st_.st_mtime_ns, st_.st_size, st_.st_ino)
+
+def ledger_exists(path): return BACKEND == "sqlite" or os.path.exists(path)
+
+def _normalize(df):
+    # Rows straight from SQLite (page / recent windows): parse their dates
+    with metrics.timer("dates.normalize") as m:
+        for col in DATE_COLS:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors="coerce")  # invalid/missing become NaT
+                m["rows"] = m.get("rows", 0) + len(df)
+    return df
+
+def _evict(key):
+    # Drops the frame and the row orders derived from it (counted in its nbytes)
+    global _cache_bytes
+    hit = _cache.pop(key, None)
+    if hit: _cache_bytes -= hit[1]
+    _orders.pop(key, None)
+    _sorts.pop(key, None)
+
+def _trim():
+    while _cache_bytes > CACHE_MAX_BYTES and len(_cache) > 1:
+        _evict(next(iter(_cache)))
+
+def _nbytes(value): return sum(x.nbytes for x in value if isinstance(x, np.ndarray))
+
+def _keep(key, stamp_, table, value, name=None):
+    # Store an array derived from the cached frame (a row order) with its cache entry:
+    # table[key] (or table[key][name]). It counts toward CACHE_MAX_BYTES and is evicted
+    # with the entry; not kept at all if the entry is gone or holds another version.
+    global _cache_bytes
+    with _cache_lock:
+        hit = _cache.get(key)
+        if not hit or hit[0] != stamp_: return
+        slot, k = (table, key) if name is None else (table.setdefault(key, {}), name)
+        old = slot.get(k)
+        slot[k] = value
+        n = _nbytes(value) - (_nbytes(old) if old else 0)
+        _cache[key] = (hit[0], hit[1] + n, hit[2])
+        _cache_bytes += n
+        _trim()
+
+def invalidate(path):
+    key = os.path.abspath(path)
+    with _cache_lock:
+        _versions[key] = _versions.get(key, 0) + 1
+        _evict(key)
+
+def read_typed(path):
+    # Live rows in compact form (see typed.py): what the cache holds and what
+    # sorts, filters and aggregate scans run on. Callers get a shallow copy.
+    global _cache_bytes
+    _drain(path)
+    key = os.path.abspath(path)
+    version = _versions.get(key, 0)
+    stamp_ = (stamp(key), version)
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit and hit[0] == stamp_:
+            _cache.move_to_end(key)
+            metrics.count("ledger.cache_hit")
+            return hit[2].copy(deep=False)
+    metrics.count("ledger.cache_miss")
+    raw = load_ledger(path)
+    with metrics.timer("ledger.encode") as m:
+        df = typed.encode(raw)
+        m["rows"] = len(df)
+    del raw
+    nbytes = int(df.memory_usage(index=True, deep=True).sum())
+    with _cache_lock:
+        if _versions.get(key, 0) == version:  # no write raced with the parse
+            _evict(key)
+            _cache[key] = (stamp_, nbytes, df)
+            _cache_bytes += nbytes
+            _trim()
+    return df.copy(deep=False)
+
+def read_ledger(path):
+    # The whole ledger in display types (datetime64 dates, float money, str labels).
+    # Decoded on every call; paths that only need a window use page() / recent().
+    return typed.decode(read_typed(path))
+
+def _date_order(path, df):
+    # Date-descending row order of the cached frame, computed once per ledger version
+    key = os.path.abspath(path)
+    stamp_ = (stamp(key), _versions.get(key, 0))
+    hit = _orders.get(key)
+    if hit and hit[0] == stamp_: return hit[1], hit[2]
+    with metrics.timer("ledger.sort") as m:
+        days = df["Date"].to_numpy(dtype="int64", na_value=typed.NAT)  # missing sorts first -> last once reversed
+        order = np.argsort(days, kind="stable")[::-1]  # ties: later rows first
+        m["rows"] = len(df)
+    valid = int(df["Date"].notna().sum())
+    _keep(key, stamp_, _orders, (stamp_, order, valid))
+    return order, valid
+
+def _sort_order(path, df, col, descending):
+    # Row positions of the cached frame sorted by col (missing values last), once per ledger version
+    key = os.path.abspath(path)
+    stamp_ = (stamp(key), _versions.get(key, 0))
+    hit = _sorts.get(key, {}).get((col, descending))
+    if hit and hit[0] == stamp_: return hit[1]
+    with metrics.timer("ledger.sort") as m:
+        order = df[col].reset_index(drop=True).sort_values(ascending=not descending, kind="stable",
+                                                           na_position="last").index.to_numpy()
+        m["rows"] = len(df)
+    _keep(key, stamp_, _sorts, (stamp_, order), (col, descending))
+    return order
+
+def page(path, sort="Date", descending=True, date_from=None, date_to=None, where=None, offset=0, limit=50):
+    # One window of a filtered, sorted ledger: (rows offset..offset+limit, number of matching rows).
+    # date_from/date_to bound Date (inclusive); where = {column: allowed values}.
+    _drain(path)
+    if BACKEND == "sqlite":
+        rows, total = _sql().page(path, sort, descending, date_from, date_to, where, offset, limit)
+        return _normalize(rows), total
+    df = read_typed(path)
+    if df.empty: return typed.decode(df), 0
+    key = os.path.abspath(path)
+    sig = (sort, descending, date_from, date_to, tuple((c, tuple(v)) for c, v in (where or {}).items()))
+    stamp_ = (stamp(key), _versions.get(key, 0))
+    hit = _sorts.get(key, {}).get("filtered")  # the last filter, so paging through it is a slice
+    if hit and hit[0] == stamp_ and hit[1] == sig:
+        order = hit[2]
+    else:
+        order = _sort_order(path, df, sort, descending)
+        mask = np.ones(len(df), dtype=bool)
+        if date_from is not None: mask &= (df["Date"] >= typed.days(date_from)).to_numpy(dtype=bool, na_value=False)
+        if date_to is not None: mask &= (df["Date"] <= typed.days(date_to)).to_numpy(dtype=bool, na_value=False)
+        for col, values in (where or {}).items():
+            mask &= df[col].isin(list(values)).to_numpy(dtype=bool)
+        if not mask.all(): order = order[mask[order]]
+        _keep(key, stamp_, _sorts, (stamp_, sig, order), "filtered")
+    return typed.decode(df.iloc[order[offset:offset + limit]]), len(order)
+
+def recent(path, k, offset=0):
+    # Latest k rows by Date (newest first), skipping the first `offset`; rows without a date are left out
+    _drain(path)
+    if BACKEND == "sqlite": return _normalize(_sql().recent(path, k, offset))
+    df = read_typed(path)
+    if df.empty: return typed.decode(df)
+    order, valid = _date_order(path, df)
+    return typed.decode(df.iloc[order[offset:min(offset + k, valid)]])
+
+# ---------------------------
+# Per-user partitions
+# ---------------------------
+def user_id(username):
+    name = username.strip().lower()
+    uid = re.sub(r"[^a-z0-9_-]", "", name)
+    if uid != name or not uid:  # keep distinct names distinct after sanitizing
+        uid = f"{uid}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}".lstrip("-")
+    return uid
+
+def user_dir(uid): return "." if uid == GUEST else os.path.join(USERS_DIR, uid)
+
+def all_users():
+    # Every partition (for the nightly batches): the guest plus each directory under data/users
+    return [GUEST] + (sorted(os.listdir(USERS_DIR)) if os.path.isdir(USERS_DIR) else [])
+
+def owner(path):
+    # User id a ledger path belongs to (the partition key of the SQLite backend)
+    d = os.path.relpath(os.path.dirname(os.path.abspath(path)))
+    if d == ".": return GUEST
+    if os.path.dirname(d) == USERS_DIR: return os.path.basename(d)
+    return d
+
+def user_files(uid):
+    d = user_dir(uid)
+    return {"user": uid, "dir": d,
+            "exp": os.path.join(d, EXP_FILE), "inc": os.path.join(d, INC_FILE),
+            "inv": os.path.join(d, INV_FILE), "goal": os.path.join(d, GOAL_FILE),
+            "val": os.path.join(d, VAL_FILE),
+            "settings": os.path.join(d, SET_FILE)}
+
+def open_user(uid):
+    # Session handle: the user's file paths, with the ledgers created/recovered
+    files = user_files(uid)
+    os.makedirs(files["dir"], exist_ok=True)
+    for k in ("exp", "inc", "inv", "goal", "val"):
+        ensure_ledger(files[k])
+    return files
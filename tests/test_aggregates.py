@@ -0,0 +1,58 @@
+# tests/test_aggregates.py — incremental views: write deltas match a full rescan
+import pandas as pd
+import pytest
+import storage
+import incremental
+import aggregates
+
+@pytest.fixture
+def exp(tmp_path):
+    path = str(tmp_path / "expenses.csv")
+    storage.ensure_ledger(path)
+    storage.append_records(path, [{"Date": "2026-01-02", "Category": "Food", "Note": "a", "Amount": 10.0},
+                                  {"Date": "2026-02-03", "Category": "Rent", "Note": "b", "Amount": 900.0}])
+    return path
+
+def writes(path):
+    # One of each: row-by-row append, batched append, delete, update (category, date, amount), queued submit
+    yield lambda: storage.append_records(path, [{"Date": "2026-02-10", "Category": "Food", "Note": "c", "Amount": 4.25},
+                                                {"Date": "", "Category": "Food", "Note": "undated", "Amount": 1.0},
+                                                {"Date": "2026-03-01", "Note": "uncategorized", "Amount": 2.5}])
+    yield lambda: storage.append_records(path, pd.DataFrame({
+        "Date": pd.date_range("2025-12-20", periods=3 * incremental.BATCH_ROWS).strftime("%Y-%m-%d"),
+        "Category": ["Food", "Transport", "Bills"] * incremental.BATCH_ROWS, "Note": "bulk", "Amount": 0.01}))
+    yield lambda: storage.delete_records(path, [2, 4, 10])
+    yield lambda: storage.update_records(path, [{"Id": 1, "Category": "Bills", "Date": "2026-03-05", "Amount": 12.5},
+                                                {"Id": 3, "Amount": 0.75}])
+    yield lambda: storage.submit(path, {"Date": "2026-03-06", "Category": "Health", "Note": "d", "Amount": 30.0})
+
+def rescan(path):
+    s = aggregates._empty()
+    aggregates._apply_frame(path, s, storage.read_typed(path))
+    return {k: s[k] for k in ("buckets", "total", "months", "groups")}
+
+def test_deltas_match_a_rescan_after_every_write(exp):
+    s = incremental.get(aggregates.VIEW, exp)
+    for write in writes(exp):
+        version = aggregates.version(exp)
+        write()
+        assert incremental.get(aggregates.VIEW, exp) is s  # patched in place, not rebuilt
+        assert aggregates.version(exp) != version
+        assert {k: s[k] for k in ("buckets", "total", "months", "groups")} == rescan(exp)
+    assert aggregates.total(exp) == pytest.approx(storage.read_ledger(exp)["Amount"].sum())
+
+def test_state_from_another_version_is_rebuilt(exp):
+    s = incremental.get(aggregates.VIEW, exp)
+    with open(exp, "a") as f: f.write("99,2026-03-07,Food,elsewhere,5.0,\n")  # another process appended
+    storage.append_record(exp, {"Date": "2026-03-08", "Category": "Food", "Note": "e", "Amount": 1.0})
+    rebuilt = incremental.get(aggregates.VIEW, exp)
+    assert rebuilt is not s
+    assert {k: rebuilt[k] for k in ("buckets", "total", "months", "groups")} == rescan(exp)
+    assert aggregates.count(exp) == 4
+
+def test_compaction_rebuilds(exp):
+    s = incremental.get(aggregates.VIEW, exp)
+    storage.delete_records(exp, [1])
+    storage.compact(exp)
+    assert incremental.get(aggregates.VIEW, exp) is not s
+    assert aggregates.monthly(exp).to_dict() == {"2026-02": 900.0}
@@ -0,0 +1,62 @@
+# tests/test_budgets.py — spend counters kept by write deltas match a full rescan; alert levels
+import json, os
+import pandas as pd
+import pytest
+import storage
+import incremental
+import budgets
+
+TODAY = "2026-03-10"
+
+@pytest.fixture
+def exp(tmp_path):
+    path = str(tmp_path / "expenses.csv")
+    storage.ensure_ledger(path)
+    with open(tmp_path / storage.SET_FILE, "w") as f:
+        json.dump({"monthly_budget": 1000.0, "budgets": [{"Category": "Food", "Period": "Week", "Amount": 50.0},
+                                                         {"Category": "Food", "Period": "Month", "Amount": 200.0}]}, f)
+    storage.append_records(path, [{"Date": "2026-03-02", "Category": "Food", "Note": "a", "Amount": 10.0},
+                                  {"Date": "2026-03-03", "Category": "Rent", "Note": "b", "Amount": 900.0}])
+    return path
+
+def writes(path):
+    yield lambda: storage.append_records(path, [{"Date": "2026-03-09", "Category": "Food", "Note": "c", "Amount": 4.25},
+                                                {"Date": "", "Category": "Food", "Note": "undated", "Amount": 1.0},
+                                                {"Date": "2026-03-10", "Note": "uncategorized", "Amount": 2.5}])
+    yield lambda: storage.append_records(path, pd.DataFrame({
+        "Date": pd.date_range("2025-12-20", periods=3 * incremental.BATCH_ROWS).strftime("%Y-%m-%d"),
+        "Category": ["Food", "Transport", "Bills"] * incremental.BATCH_ROWS, "Note": "bulk", "Amount": 0.5}))
+    yield lambda: storage.delete_records(path, [2, 4, 10])
+    yield lambda: storage.update_records(path, [{"Id": 1, "Category": "Bills", "Date": "2026-03-05", "Amount": 12.5},
+                                                {"Id": 3, "Date": "2026-02-27"}])
+    yield lambda: storage.submit(path, {"Date": "2026-03-10", "Category": "Food", "Note": "d", "Amount": 30.0})
+
+def test_counters_match_a_rescan_after_every_write(exp):
+    budgets.status(exp, TODAY)
+    s = incremental.get(budgets.VIEW, exp)
+    for write in writes(exp):
+        write()
+        status = budgets.status(exp, TODAY)
+        assert incremental.get(budgets.VIEW, exp) is s
+        assert s["spent"] == budgets._count(storage.read_typed(exp))
+        fresh = budgets._build(os.path.abspath(exp))
+        budgets._evaluate_all(fresh, budgets._today(TODAY))
+        assert s["status"] == fresh["status"]
+    df = storage.read_ledger(exp)
+    march = df[df["Date"].dt.to_period("M") == "2026-03"]
+    assert budgets.spent(exp, "Month", today=TODAY) == pytest.approx(march["Amount"].sum())
+    assert budgets.spent(exp, "Month", "Food", TODAY) == pytest.approx(march.loc[march["Category"] == "Food", "Amount"].sum())
+
+def levels(path):
+    return budgets.status(path, TODAY).set_index(["Period", "Category"])["Level"].fillna("ok").to_dict()
+
+def test_levels_follow_writes(exp):
+    assert levels(exp) == {("Week", "Food"): "ok", ("Month", budgets.ALL): "warn", ("Month", "Food"): "ok"}  # 910 of 1000
+    storage.append_record(exp, {"Date": "2026-03-09", "Category": "Food", "Note": "e", "Amount": 45.0})
+    assert levels(exp)[("Week", "Food")] == "warn"  # the week runs from Monday 9 March: 45 of 50
+    storage.append_record(exp, {"Date": "2026-03-10", "Category": "Food", "Note": "f", "Amount": 10.0})
+    assert levels(exp) == {("Week", "Food"): "over", ("Month", budgets.ALL): "warn",
+                           ("Month", "Food"): "pace"}  # 65 by day 10 of 31 projects past 200
+    assert budgets.alerts(exp, TODAY)["Level"].tolist() == ["over", "warn", "pace"]
+    storage.delete_records(exp, [4])
+    assert levels(exp)[("Week", "Food")] == "warn"
@@ -0,0 +1,53 @@
+# tests/test_forecast.py — batched trend + seasonal fit on synthetic series
+import numpy as np
+import pandas as pd
+import storage
+import forecast
+
+END = pd.Period("2025-12", "M").ordinal
+
+def synthetic(T, extra=3, slope=2.0, swing=20.0):
+    # 100 + slope * t + a sine over the calendar year, for T months ending at END plus `extra` ahead
+    t = np.arange(T + extra)
+    moy = (END - T + 1 + t) % 12
+    return 100 + slope * t + swing * np.sin(2 * np.pi * moy / 12)
+
+def test_trend_and_season_are_recovered():
+    y = synthetic(36)
+    f = forecast.fit(y[None, :36], np.ones((1, 36), dtype=bool), END)
+    mean, se = forecast.predict(f, 3)
+    np.testing.assert_allclose(mean[0], y[36:], atol=1e-6)
+    np.testing.assert_allclose(se[0], 0.0, atol=1e-6)
+
+def test_noisy_series_stays_within_its_interval():
+    y = synthetic(48, extra=6)
+    noise = np.random.default_rng(0).normal(0, 5, (500, 54))
+    f = forecast.fit(y[:48] + noise[:, :48], np.ones((500, 48), dtype=bool), END)
+    mean, se = forecast.predict(f, 6)
+    inside = np.abs(y[48:] + noise[:, 48:] - mean) <= forecast.Z * se  # the months that actually come
+    assert 0.75 <= inside.mean() <= 0.85  # an 80% interval
+
+def test_short_and_masked_series():
+    # Row 0: 12 months (trend, no season); row 1: observed for 2 months only (flat); row 2: full seasonal
+    y = synthetic(36)
+    Y = np.vstack([y[:36], y[:36], y[:36]])
+    M = np.ones_like(Y, dtype=bool)
+    M[0, :24] = False
+    M[1, :34] = False
+    Y[~M] = 0.0
+    f = forecast.fit(Y, M, END)
+    assert f["season"][0].tolist() == [0.0] * 12 and f["b"][0] != 0
+    assert f["b"][1] == 0 and f["season"][1].tolist() == [0.0] * 12
+    np.testing.assert_allclose(forecast.predict(f, 1)[0][2], y[36:37], atol=1e-6)
+
+def test_ledger_forecast(tmp_path):
+    exp = str(tmp_path / "expenses.csv")
+    storage.ensure_ledger(exp)
+    y = synthetic(36)
+    months = pd.period_range(end=forecast.EPOCH_MONTH + END, periods=36, freq="M")
+    storage.append_records(exp, pd.DataFrame({"Date": [str(m.start_time.date()) for m in months], "Category": "Food",
+                                              "Note": "", "Amount": y[:36].round(2)}))
+    df = forecast.forecast(exp, months=3, today="2026-01-15")
+    assert df["Month"].tolist() == ["2026-01", "2026-02", "2026-03"]
+    np.testing.assert_allclose(df["Forecast"], y[36:], atol=0.05)
+    assert (df["Low"] <= df["Forecast"]).all() and (df["Forecast"] <= df["High"]).all()
@@ -0,0 +1,53 @@
+# tests/test_goals.py — goal queue: priority/deadline order, allocation, projections
+import numpy as np
+import pandas as pd
+import goals
+
+TODAY = "2026-01-15"
+
+def frame(rows):
+    # rows: (name, target, saved, target date or None, priority or None)
+    df = pd.DataFrame(rows, columns=["Name", "TargetAmount", "SavedSoFar", "TargetDate", "Priority"])
+    df["TargetDate"] = pd.to_datetime(df["TargetDate"])
+    return df
+
+def test_queue_is_priority_then_deadline():
+    df = frame([("Later", 100.0, 0.0, "2026-12-01", 2), ("Low", 100.0, 0.0, "2026-02-01", 3),
+                ("Sooner", 100.0, 0.0, "2026-06-01", 2), ("Open", 100.0, 0.0, None, 2), ("Top", 100.0, 0.0, None, 1)])
+    assert df["Name"][goals._plan(df, TODAY)["order"]].tolist() == ["Top", "Sooner", "Later", "Open", "Low"]
+
+def test_allocation_in_queue_order_never_overfills():
+    df = frame([("B", 300.0, 0.0, None, 2), ("A", 200.0, 50.0, None, 1), ("C", 100.0, 100.0, None, 1)])
+    assert goals.allocate(df, 20_000, TODAY).tolist() == [5_000, 15_000, 0]  # A filled first, C already full
+    added = goals.allocate(df, 10_000_000, TODAY)
+    assert added.tolist() == [30_000, 15_000, 0]  # more than all goals need: the rest stays unallocated
+
+def test_deadline_shares_come_before_the_queue():
+    # "Trip" is lower priority but needs 100/month for 3 months (this one included) to make its date
+    df = frame([("House", 10_000.0, 0.0, None, 1), ("Trip", 300.0, 0.0, "2026-03-10", 3)])
+    assert goals.allocate(df, 50_000, TODAY).tolist() == [40_000, 10_000]
+    assert goals.allocate(df, 6_000, TODAY).tolist() == [0, 6_000]  # not even the share: it all goes there
+
+def test_overdue_goal_is_due_in_full():
+    df = frame([("Phone", 500.0, 100.0, "2025-11-20", 2), ("Car", 1_000.0, 0.0, "2027-01-01", 1)])
+    added = goals.allocate(df, 100_000, TODAY)
+    assert added[0] == 40_000
+    assert added.sum() == 100_000 and (added <= np.array([40_000, 100_000])).all()
+
+def test_allocations_add_up_exactly():
+    rng = np.random.default_rng(0)
+    df = frame([(f"g{i}", float(rng.integers(1, 5_000)), float(rng.integers(0, 500)),
+                 rng.choice([None, "2026-03-01", "2026-09-30", "2025-12-01"]), int(rng.integers(1, 4)))
+                for i in range(40)])
+    remaining = goals._plan(df, TODAY)["remaining"]
+    for amount in (0, 1, 12_345, 9_999_999, int(remaining.sum()) + 1):
+        added = goals.allocate(df, amount, TODAY)
+        assert (added >= 0).all() and (added <= remaining).all()
+        assert added.sum() == min(amount, remaining.sum())
+
+def test_projection_follows_the_queue():
+    df = frame([("Second", 300.0, 0.0, "2026-02-28", 2), ("First", 200.0, 0.0, None, 1)])
+    p = goals.project(df, 100.0, TODAY)
+    assert p["Projected"].dt.strftime("%Y-%m").tolist() == ["2026-05", "2026-02"]  # 500 at 100/month after First
+    assert p["OnTrack"].tolist() == [False, True]
+    assert p["Needed"].tolist() == [150.0, 0.0]
@@ -0,0 +1,45 @@
+# tests/test_importer.py — statement import: duplicate rows counted, re-imports idempotent
+import pytest
+import storage
+import importer
+
+STATEMENT = """Date,Description,Amount,Category
+2026-01-02,STARBUCKS,-4.50,Food
+2026-01-02,STARBUCKS,-4.50,Food
+2026-01-02,STARBUCKS,-4.50,Food
+2026-01-03,METRO,-2.00,Transport
+2026-01-04,SALARY,3000.00,
+"""
+
+@pytest.fixture
+def exp(tmp_path):
+    path = str(tmp_path / "expenses.csv")
+    storage.ensure_ledger(path)
+    return path
+
+@pytest.fixture
+def statement(tmp_path):
+    path = str(tmp_path / "statement.csv")
+    with open(path, "w") as f: f.write(STATEMENT)
+    return path
+
+@pytest.mark.parametrize("chunksize", [importer.CHUNK_ROWS, 2])  # equal rows in one chunk or across chunks
+def test_legitimate_duplicates_are_kept(exp, statement, chunksize):
+    added, skipped = importer.import_file(statement, exp, debits_negative=True, chunksize=chunksize)
+    assert (added, skipped) == (4, 1)  # the credit is not an expense
+    df = storage.read_ledger(exp)
+    assert (df["Note"] == "STARBUCKS").sum() == 3
+    assert df["Amount"].sum() == 15.5
+
+def test_reimporting_a_statement_is_idempotent(exp, statement):
+    importer.import_file(statement, exp, debits_negative=True)
+    assert importer.import_file(statement, exp, debits_negative=True, chunksize=2) == (0, 5)
+    assert len(storage.read_ledger(exp)) == 4
+
+def test_an_overlapping_statement_adds_only_the_new_rows(exp, statement, tmp_path):
+    importer.import_file(statement, exp, debits_negative=True)
+    later = str(tmp_path / "later.csv")
+    with open(later, "w") as f:  # one more STARBUCKS that day, and a new day
+        f.write(STATEMENT + "2026-01-02,STARBUCKS,-4.50,Food\n2026-01-05,METRO,-2.00,Transport\n")
+    assert importer.import_file(later, exp, debits_negative=True) == (2, 5)
+    assert (storage.read_ledger(exp)["Note"] == "STARBUCKS").sum() == 4
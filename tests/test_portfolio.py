@@ -0,0 +1,51 @@
+# tests/test_portfolio.py — valuation snapshots and time-weighted returns
+import pandas as pd
+import pytest
+import storage
+import portfolio
+
+DAYS = pd.date_range("2026-01-01", periods=6).strftime("%Y-%m-%d").tolist()
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    files = {k: str(tmp_path / name) for k, name in (("inv", storage.INV_FILE), ("val", storage.VAL_FILE))}
+    for path in files.values(): storage.ensure_ledger(path)
+    monkeypatch.setattr(portfolio, "PRICE_FILE", str(tmp_path / "prices.csv"))
+    monkeypatch.setitem(portfolio._prices, "stamp", None)
+    return files
+
+def valuations(files, rows):
+    # rows: (day index, holding, value, flow)
+    storage.append_records(files["val"], [{"Date": DAYS[d], "Holding": h, "Type": "Gold", "Value": v, "Flow": f}
+                                          for d, h, v, f in rows])
+
+def test_twr_takes_contributions_and_sales_out_of_the_return(files):
+    valuations(files, [
+        (0, 1, 1000.0, 1000.0),                      # first valued: its value flows in
+        (1, 1, 1100.0, 0.0),                         # +10%
+        (2, 2, 500.0, 500.0),                        # contribution: new holding, no return
+        (3, 1, 1210.0, 0.0), (3, 2, 550.0, 0.0),     # both +10%
+        (4, 2, 0.0, -550.0),                         # sale: its last value flows out, no return
+        (5, 1, 1089.0, 0.0),                         # -10%
+    ])
+    assert portfolio.twr(files, end=DAYS[5]) == pytest.approx(1.1 * 1.1 * 0.9 - 1)
+    assert portfolio.twr(files, DAYS[1], DAYS[3]) == pytest.approx(0.1)
+    assert portfolio.twr(files, DAYS[2], DAYS[4]) == pytest.approx(0.1)
+    assert portfolio.value(files, DAYS).tolist() == [1000.0, 1100.0, 1600.0, 1760.0, 1210.0, 1089.0]
+    assert portfolio.history(files)["Flow"].tolist() == [1000.0, 0.0, 500.0, 0.0, -550.0, 0.0]
+    perf = portfolio.performance(files, DAYS[1])
+    assert perf["Return"].tolist() == pytest.approx([0.0, 0.1, 0.1, -0.01])
+
+def test_snapshots_from_prices_give_the_price_return(files):
+    with open(portfolio.PRICE_FILE, "w") as f:
+        f.write("Date,Symbol,Price\n" + "".join(f"{d},Gold,{p}\n" for d, p in zip(DAYS, [100, 110, 110, 121, 121, 108.9])))
+    storage.append_record(files["inv"], {"Date": DAYS[0], "Type": "Gold", "Amount": 1000.0})
+    assert portfolio.snapshot(files, DAYS[:2]) == 2
+    second = storage.append_record(files["inv"], {"Date": DAYS[2], "Type": "Gold", "Amount": 500.0})  # bought at 110
+    portfolio.snapshot(files, DAYS[2:4])
+    storage.delete_records(files["inv"], [second])  # sold
+    portfolio.snapshot(files, DAYS[4:])
+    assert portfolio.value(files, DAYS).tolist() == [1000.0, 1100.0, 1600.0, 1760.0, 1210.0, 1089.0]
+    assert portfolio.twr(files, end=DAYS[5]) == pytest.approx(108.9 / 100 - 1)
+    assert portfolio.allocation(files, DAYS[3])["Value"].to_dict() == {"Gold": 1760.0}
+    assert portfolio.snapshot(files, DAYS[:3]) == 0  # days already snapshotted are skipped
@@ -0,0 +1,62 @@
+# tests/test_snapshot.py — columnar snapshots: schema kinds, CSV tail, rebuilds
+import os, threading
+import pandas as pd
+import pytest
+import storage
+import snapshot
+
+@pytest.fixture
+def exp(tmp_path):
+    path = str(tmp_path / "expenses.csv")
+    storage.ensure_ledger(path)
+    return path
+
+def test_snapshot_of_an_empty_ledger_then_append(exp):
+    snapshot.build(exp)
+    storage.append_records(exp, [{"Date": "2026-01-02", "Category": "Food", "Note": "Coffee", "Amount": 4.5}])
+    df = storage.read_ledger(exp)
+    assert df["Id"].tolist() == [1]
+    assert df["Amount"].tolist() == [4.5]
+    assert df["Note"].tolist() == ["Coffee"]
+    assert {c["name"]: c["kind"] for c in snapshot._read_meta(exp)["columns"]}["Amount"] == "num"
+
+def test_all_blank_text_column_stays_text(exp):
+    storage.append_records(exp, [{"Date": "2026-01-02", "Category": "Food", "Amount": 1.0}] * 3)
+    snapshot.build(exp)
+    storage.append_records(exp, [{"Date": "2026-01-03", "Category": "Food", "Note": "Lunch", "Amount": 2.0}])
+    df = storage.read_ledger(exp)
+    assert df["Note"].isna().sum() == 3
+    assert df["Note"].iloc[-1] == "Lunch"
+
+def test_numeric_looking_notes_keep_their_text(exp):
+    storage.append_records(exp, [{"Date": "2026-01-02", "Note": "007", "Amount": 1.0}])
+    snapshot.build(exp)
+    assert snapshot.load(exp)["Note"].tolist() == ["007"]
+
+def test_load_matches_csv_after_tail_and_rewrite(exp):
+    storage.append_records(exp, [{"Date": "2026-01-02", "Category": "Food", "Note": f"n{i}", "Amount": i} for i in range(5)])
+    snapshot.build(exp)
+    storage.append_records(exp, [{"Date": "2026-02-01", "Category": "Rent", "Note": "flat", "Amount": 900.0}])
+    storage.delete_records(exp, [2])
+    storage.compact(exp)  # new inode: the snapshot is rebuilt on the next load
+    df = storage.read_ledger(exp)
+    assert df["Id"].tolist() == [1, 3, 4, 5, 6]
+    assert df["Category"].tolist() == ["Food"] * 4 + ["Rent"]
+    assert len(os.listdir(snapshot.snap_dir(exp))) == 1 + 6 + 2  # meta + one generation (6 columns, 2 of them text)
+
+def test_concurrent_loads_during_rebuilds(exp):
+    storage.append_records(exp, pd.DataFrame({"Date": ["2026-01-02"] * 2000, "Category": "Food", "Amount": 1.0}))
+    snapshot.build(exp)
+    errors = []
+    def reader():
+        for _ in range(20):
+            try:
+                assert len(snapshot.load(exp)) == 2000
+            except Exception as e:
+                errors.append(e)
+    def builder():
+        for _ in range(10): snapshot.build(exp)
+    threads = [threading.Thread(target=reader) for _ in range(4)] + [threading.Thread(target=builder)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert errors == []
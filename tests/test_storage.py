@@ -0,0 +1,137 @@
+# tests/test_storage.py — ledger storage: recovery, record ids, compaction, transactions
+import os, sys, subprocess
+import pandas as pd
+import pytest
+import storage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def exp(tmp_path):
+    path = str(tmp_path / "expenses.csv")
+    storage.ensure_ledger(path)
+    return path
+
+def rows(n, amount=1.0):
+    return [{"Date": "2026-01-02", "Category": "Food", "Note": f"n{i}", "Amount": amount} for i in range(n)]
+
+# ---------------------------
+# Recovery
+# ---------------------------
+def test_recover_cuts_a_torn_append(exp):
+    storage.append_records(exp, rows(2))
+    with open(exp, "a") as f: f.write("3,2026-01-0")  # crashed mid-row
+    storage.recover(exp)
+    assert open(exp).read().endswith("\n")
+    assert storage.read_ledger(exp)["Id"].tolist() == [1, 2]
+
+def test_recover_drops_an_interrupted_compaction(exp):
+    storage.append_records(exp, rows(2))
+    with open(exp + ".tmp", "w") as f: f.write("Id,Date\n1,")
+    storage.recover(exp)
+    assert not os.path.exists(exp + ".tmp")
+    assert len(storage.read_ledger(exp)) == 2
+
+# ---------------------------
+# Round-trips
+# ---------------------------
+def test_append_delete_update_compact(exp):
+    assert storage.append_records(exp, rows(3)) == [1, 2, 3]
+    assert storage.delete_records(exp, [2]) == 1
+    assert storage.update_records(exp, [{"Id": 3, "Category": "Bills", "Amount": 7.5}]) == 1
+    df = storage.read_ledger(exp)
+    assert df["Id"].tolist() == [1, 3]
+    assert df["Category"].tolist() == ["Food", "Bills"]
+    assert df["Amount"].tolist() == [1.0, 7.5]
+    assert df.loc[1, "Note"] == "n2"  # fields not in the edit are kept
+
+    storage.compact(exp)
+    raw = pd.read_csv(exp)
+    assert raw["Id"].tolist() == [1, 3] and raw["Deleted"].isna().all()
+    pd.testing.assert_frame_equal(storage.read_ledger(exp), df)
+
+def test_bulk_append_frame(exp):
+    ids = storage.append_records(exp, pd.DataFrame(rows(4, 2.5)))
+    assert ids == [1, 2, 3, 4]
+    assert storage.read_ledger(exp)["Amount"].sum() == 10.0
+
+def test_submit_is_read_back(exp):
+    i = storage.submit(exp, rows(1)[0])
+    assert storage.read_ledger(exp)["Id"].tolist() == [i]
+
+# ---------------------------
+# Transactions
+# ---------------------------
+def test_transact_retries_after_a_racing_write(exp, tmp_path):
+    inc = str(tmp_path / "incomes.csv")
+    storage.ensure_ledger(inc)
+    calls = []
+    def fn(df):
+        calls.append(len(df))
+        if len(calls) == 1: storage.append_record(inc, {"Date": "2026-01-02", "Source": "Job", "Amount": 5.0})
+        return rows(1)
+    assert storage.transact(exp, fn, watch=(inc,)) == [1]
+    assert calls == [0, 0]  # re-run on fresh data, appended once
+    assert len(storage.read_ledger(exp)) == 1
+
+def test_transact_final_attempt_holds_the_locks(exp):
+    calls = []
+    def fn(df):
+        calls.append(len(df))
+        storage.append_record(exp, rows(1)[0])  # every run races with a write
+        return rows(1)
+    storage.transact(exp, fn, retries=2)
+    assert len(calls) == 3
+    assert len(storage.read_ledger(exp)) == 4
+
+def test_transact_writes_nothing_for_no_records(exp):
+    assert storage.transact(exp, lambda df: []) is None
+    assert storage.read_ledger(exp).empty
+
+# ---------------------------
+# Ids across a restart (fresh process each step)
+# ---------------------------
+def run(path, code):
+    src = f"import storage; p = {path!r}; storage.ensure_ledger(p); {code}"
+    out = subprocess.run([sys.executable, "-c", src], cwd=ROOT, check=True, capture_output=True, text=True)
+    return out.stdout.strip()
+
+def test_ids_continue_after_a_restart(exp):
+    assert run(exp, "print(storage.append_records(p, [{'Amount': 1.0}] * 3))") == "[1, 2, 3]"
+    assert run(exp, "print(storage.append_record(p, {'Amount': 1.0}))") == "4"
+
+def test_ids_of_compacted_deletes_are_not_reused(exp):
+    run(exp, "storage.append_records(p, [{'Amount': 1.0}] * 3)")
+    run(exp, "storage.delete_records(p, [3]); storage.compact(p)")
+    assert pd.read_csv(exp)["Id"].tolist() == [1, 2]
+    assert run(exp, "print(storage.append_record(p, {'Amount': 1.0}))") == "4"
+
+# ---------------------------
+# Cache budget
+# ---------------------------
+def test_row_orders_are_counted_and_evicted_with_the_frame(exp, tmp_path, monkeypatch):
+    storage.append_records(exp, rows(50))
+    key = os.path.abspath(exp)
+    storage.recent(exp, 5)
+    order = storage._orders[key][1]
+    assert storage._cache[key][1] == int(storage.read_typed(exp).memory_usage(index=True, deep=True).sum()) + order.nbytes
+    other = str(tmp_path / "incomes.csv")
+    storage.ensure_ledger(other)
+    storage.append_record(other, {"Date": "2026-01-02", "Source": "Job", "Amount": 5.0})
+    monkeypatch.setattr(storage, "CACHE_MAX_BYTES", 1)
+    storage.read_typed(other)  # over budget: the older entry goes, with its order
+    assert key not in storage._cache and key not in storage._orders
+
+def test_page_sorts_are_counted_and_evicted_with_the_frame(exp, tmp_path, monkeypatch):
+    storage.append_records(exp, rows(50))
+    key = os.path.abspath(exp)
+    base = int(storage.read_typed(exp).memory_usage(index=True, deep=True).sum())
+    storage.page(exp, sort="Amount", where={"Category": ["Food"]}, limit=10)
+    storage.page(exp, sort="Amount", where={"Category": ["Rent"]}, limit=10)  # replaces the last filter
+    sorts = storage._sorts[key]
+    assert storage._cache[key][1] == base + sorts[("Amount", True)][1].nbytes + sorts["filtered"][2].nbytes
+    other = str(tmp_path / "incomes.csv")
+    storage.ensure_ledger(other)
+    monkeypatch.setattr(storage, "CACHE_MAX_BYTES", 1)
+    storage.read_typed(other)
+    assert key not in storage._sorts
@@ -0,0 +1,91 @@
+# trends.py — time-bucketed Amount series (day / week / month) for trend charts
+#
+# Each ledger is reduced once to daily sums (one vectorized groupby); writes
+# then adjust those sums through the storage hook, like aggregates.py does for
+# its (month, group) buckets. Week and month series are regrouped from the
+# daily sums and cached per ledger version, and a window (last 12 months, YTD,
+# ...) is a slice of that, zero-filled, so chart payloads scale with the bucket
+# count, not with the row count. Sums are kept in integer cents (exact) and
+# converted to amounts only for the returned series.
+import os, itertools
+import pandas as pd
+import storage
+import metrics
+import typed
+import incremental
+
+FREQS = {"Day": "D", "Week": "W", "Month": "M"}  # pandas period codes (weeks run Monday-Sunday)
+WINDOWS = ["Last 30 days", "Last 12 weeks", "Last 12 months", "Year to date", "All time"]
+LEDGERS = {"expenses.csv", "incomes.csv", "investments.csv"}
+VIEW = "trends"
+
+# state per ledger: {"daily": cents Series, "version", "periods": {freq: cents Series}}
+_versions = itertools.count(1)
+
+def _daily(df):
+    # Daily Amount sums in cents from a typed frame; rows without a valid date are left out
+    ok = df["Date"].notna().to_numpy(dtype=bool)
+    if not ok.any(): return pd.Series(dtype="int64", index=pd.DatetimeIndex([]))
+    day = df["Date"].to_numpy(dtype="int64", na_value=typed.NAT)[ok]
+    amount = df["Amount"].fillna(0).to_numpy(dtype="int64")[ok]
+    sums = pd.Series(amount).groupby(day).sum()
+    sums.index = pd.DatetimeIndex(sums.index.to_numpy().view("datetime64[D]").astype("datetime64[s]"))
+    return sums
+
+def _build(key):
+    df = storage.read_typed(key)
+    with metrics.timer("trend.build") as m:
+        s = {"daily": _daily(df), "version": next(_versions), "periods": {}}
+        m["rows"] = len(df)
+    return s
+
+def _on_write(key, s, records, sign):
+    delta = _daily(typed.encode(pd.DataFrame(records)))
+    s["daily"] = s["daily"].add(sign * delta, fill_value=0).astype("int64").sort_index()
+    s["version"] = next(_versions)
+    s["periods"] = {}
+
+incremental.register(VIEW, LEDGERS, _build, _on_write)
+
+def _get(key): return incremental.get(VIEW, key)
+
+# ---------------------------
+# Queries
+# ---------------------------
+def _periods(key, freq):
+    # Full-history sums per period, cached until the next write
+    s = _get(key)
+    hit = s["periods"].get(freq)
+    if hit is None:
+        daily = s["daily"]
+        hit = s["periods"][freq] = daily.groupby(daily.index.to_period(freq)).sum()
+    return hit
+
+def window(name, today=None):
+    # (start, end) dates of a named window; start None = from the first entry
+    end = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+    if name == "Last 30 days": return end - pd.Timedelta(days=29), end
+    if name == "Last 12 weeks": return (end.to_period("W") - 11).start_time, end
+    if name == "Last 12 months": return (end.to_period("M") - 11).start_time, end
+    if name == "Year to date": return pd.Timestamp(year=end.year, month=1, day=1), end
+    return None, end
+
+def series(path, freq="M", start=None, end=None):
+    # Amount per bucket between start and end (inclusive), every bucket present (0 if empty)
+    p = _periods(os.path.abspath(path), freq)
+    if start is None: start = p.index.min().start_time if len(p) else end
+    if end is None: end = p.index.max().end_time if len(p) else start
+    if start is None: return pd.Series(dtype="float64", name="Amount")
+    span = pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq=freq)
+    out = typed.money(p.reindex(span, fill_value=0))
+    out.index = span.start_time
+    return out.rename("Amount")
+
+def compare(sources, freq="M", start=None, end=None):
+    # sources: [(ledger path, label), ...] -> one column per label on a shared bucket index
+    if start is None:
+        firsts = [p.index.min().start_time for p in (_periods(os.path.abspath(path), freq) for path, _ in sources)
+                  if len(p)]
+        start = min(firsts) if firsts else None
+    if start is None: return pd.DataFrame(columns=[label for _, label in sources], dtype="float64")
+    return pd.DataFrame({label: series(path, freq, start, end) for path, label in sources})
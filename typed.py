@@ -0,0 +1,99 @@
+# typed.py — compact typed ledger frames (the form storage.py caches ledgers in)
+#
+# Money is int64 cents (nullable Int64: a blank cell stays missing), dates are
+# int32 day numbers since 1970-01-01 (nullable Int32), record ids are int32
+# while they fit, and label and note columns are categoricals: every distinct
+# string is stored once and rows hold a small integer code. Sums over cents
+# are exact. decode() turns rows back into the display types (datetime64
+# dates, float money, str labels) that pages show and edit; only the rows a
+# page actually shows need decoding.
+import numpy as np
+import pandas as pd
+
+MONEY_COLS = {"Amount", "CurrentValue", "TargetAmount", "SavedSoFar", "Value", "Flow"}
+DATE_COLS = {"Date", "TargetDate"}
+LABEL_COLS = {"Category", "Note", "Source", "Type", "Name"}
+ID_COL = "Id"
+NAT = np.iinfo("int64").min  # NaT as an int64 (datetime64 uses the same value)
+
+# ---------------------------
+# Money
+# ---------------------------
+def cents(x):
+    # Money -> cents, rounded to the cent. Series -> Int64 (missing stays missing); scalar -> int (missing = 0)
+    if isinstance(x, pd.Series):
+        v = pd.to_numeric(x, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        return pd.Series(np.round(v * 100), index=x.index).astype("Int64")
+    try:
+        x = float(x)
+    except (TypeError, ValueError):
+        return 0
+    return 0 if x != x or x in (float("inf"), float("-inf")) else int(round(x * 100))
+
+def money(c):
+    # Cents -> float amount (Series -> float64 with NaN for missing)
+    if isinstance(c, pd.Series): return pd.Series(c.to_numpy(dtype="float64", na_value=np.nan) / 100, index=c.index)
+    return c / 100
+
+# ---------------------------
+# Dates
+# ---------------------------
+def days(x):
+    # Dates -> day numbers. Series -> Int32 (invalid/missing = missing); scalar -> int
+    if isinstance(x, pd.Series):
+        d = pd.to_datetime(x, errors="coerce").to_numpy(dtype="datetime64[D]")
+        mask = np.isnat(d)
+        return pd.Series(pd.arrays.IntegerArray(np.where(mask, 0, d.view("int64")).astype("int32"), mask), index=x.index)
+    return int(pd.Timestamp(x).to_datetime64().astype("datetime64[D]").view("int64"))
+
+def dates(d):
+    # Day numbers -> datetime64 Series (NaT for missing)
+    return pd.Series(d.to_numpy(dtype="int64", na_value=NAT).view("datetime64[D]").astype("datetime64[s]"), index=d.index)
+
+def months(d):
+    # Day numbers (Int32 Series) -> int64 month numbers since 1970-01 (NAT for missing)
+    return d.to_numpy(dtype="int64", na_value=NAT).view("datetime64[D]").astype("datetime64[M]").view("int64")
+
+def month_label(m): return "" if m == NAT else str(np.datetime64(int(m), "M"))  # "YYYY-MM"
+
+# ---------------------------
+# Labels
+# ---------------------------
+def labels(s):
+    # Categorical with lexically sorted categories, so sorting by codes sorts by text
+    c = s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")
+    cats = c.cat.categories
+    if len(cats) > 1 and not cats.is_monotonic_increasing:
+        try: c = c.cat.reorder_categories(cats.sort_values())
+        except TypeError: pass  # mixed types cannot be ordered; keep first-seen order
+    return c
+
+def text(s):
+    # Categorical -> plain strings (missing stays missing)
+    cats = s.cat.categories
+    return s.astype(cats.dtype if len(cats) else object)
+
+# ---------------------------
+# Frames
+# ---------------------------
+def encode(df):
+    out = {}
+    for c in df.columns:
+        s = df[c]
+        if c in MONEY_COLS: out[c] = cents(s)
+        elif c in DATE_COLS: out[c] = days(s)
+        elif c in LABEL_COLS: out[c] = labels(s)
+        elif c == ID_COL and len(s) and s.max() < np.iinfo("int32").max: out[c] = s.astype("int32")
+        else: out[c] = s
+    return pd.DataFrame(out, index=df.index)
+
+def decode(df):
+    out = {}
+    for c in df.columns:
+        s = df[c]
+        if c in MONEY_COLS: out[c] = money(s)
+        elif c in DATE_COLS: out[c] = dates(s)
+        elif c in LABEL_COLS: out[c] = text(s)
+        elif c == ID_COL: out[c] = s.astype("int64")
+        else: out[c] = s
+    return pd.DataFrame(out, index=df.index)